@@ -0,0 +1,68 @@
+'''
+    Alert engine benchmark
+
+    Times AlertEngine.update() and update_processes() per tick with a
+    growing number of rules spread over every metric, aggregate and window
+    size, against one live process snapshot.
+
+    python3 benchmarks/bench_alerts.py --rules 10 100 1000
+'''
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from task_manager_pro import (
+    AlertEngine, AlertRule, ProcessCollector, SYSTEM_ALERT_METRICS, COUNT_ALERT_METRICS,
+    PROCESS_ALERT_COLUMNS, ALERT_AGGREGATES
+)
+
+
+def make_rules(count, process_share, rng):
+    rules = []
+    for i in range(count):
+        if rng.random() < process_share:
+            rules.append(AlertRule(f"rule-{i}", rng.choice(list(PROCESS_ALERT_COLUMNS)), '>', rng.uniform(0, 100)))
+            continue
+        aggregate = rng.choice(ALERT_AGGREGATES)
+        rules.append(AlertRule(
+            f"rule-{i}", rng.choice(SYSTEM_ALERT_METRICS + COUNT_ALERT_METRICS), rng.choice(['>', '<']),
+            rng.uniform(0, 100), duration=rng.choice([0, 10, 30]), aggregate=aggregate,
+            window=rng.choice([10, 30, 60, 300]) if aggregate != 'last' else None
+        ))
+    return rules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark alert rule evaluation")
+    parser.add_argument('--rules', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--process-share', type=float, default=0.1, help="fraction of per-process rules")
+    parser.add_argument('--ticks', type=int, default=600)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    snapshot = ProcessCollector().sample()
+    print(f"{len(snapshot.pids)} processes in the snapshot")
+    print(f"{'rules':>6} {'system us/tick':>15} {'processes us/tick':>18}")
+    for count in args.rules:
+        rng = random.Random(args.seed)
+        engine = AlertEngine(make_rules(count, args.process_share, rng))
+        system_times, process_times = [], []
+        for tick in range(args.ticks):
+            metrics = {metric: rng.uniform(0, 100) for metric in SYSTEM_ALERT_METRICS}
+            start = time.perf_counter()
+            engine.update(metrics, now=tick)
+            system_times.append((time.perf_counter() - start) * 1e6)
+            start = time.perf_counter()
+            engine.update_processes(snapshot, now=tick)
+            process_times.append((time.perf_counter() - start) * 1e6)
+        print(f"{count:>6} {statistics.median(system_times):>15.1f} {statistics.median(process_times):>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
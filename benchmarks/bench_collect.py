@@ -0,0 +1,109 @@
+'''
+    Process collection benchmark
+
+    Compares the old per-call collection loop (process_iter + separate
+    cpu_percent/memory_percent/num_threads calls) with the psutil backend,
+    which reads every column in one oneshot() pass and keeps Process
+    objects alive between ticks, and with the Linux /proc backend.
+
+    The process table is padded with idle `sleep` children up to each
+    requested size, so run it on a quiet machine:
+
+    python3 benchmarks/bench_collect.py --sizes 1000 5000 20000
+
+    File opens are counted with an audit hook. Both open() and os.open()
+    raise the `open` event, so this tracks the /proc syscalls per tick of
+    all three paths closely.
+'''
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import psutil
+from task_manager_pro import PsutilProcessBackend, ProcfsProcessBackend
+
+
+opens = {'count': 0, 'enabled': False}
+
+
+def count_opens(event, args):
+    if opens['enabled'] and event == 'open':
+        opens['count'] += 1
+
+
+def legacy_collect():
+    """The collection loop as it was before the oneshot() change"""
+    rows = []
+    for proc in sorted(psutil.process_iter(['pid', 'name', 'status']), key=lambda x: x.info['pid']):
+        try:
+            rows.append((
+                proc.info['pid'],
+                proc.info['name'],
+                proc.cpu_percent(),
+                proc.memory_percent(),
+                proc.num_threads(),
+                proc.info['status']
+            ))
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+    return rows
+
+
+def measure(collect, ticks):
+    """Return (median wall ms, median file opens) per tick"""
+    collect()  # warm-up tick so both paths have their cpu_percent baseline
+    times, counts = [], []
+    for _ in range(ticks):
+        opens['count'] = 0
+        opens['enabled'] = True
+        start = time.perf_counter()
+        collect()
+        times.append((time.perf_counter() - start) * 1000)
+        opens['enabled'] = False
+        counts.append(opens['count'])
+    return statistics.median(times), statistics.median(counts)
+
+
+def pad_process_table(children, size):
+    """Start idle children until the host has about `size` processes"""
+    missing = size - len(psutil.pids())
+    for _ in range(max(missing, 0)):
+        children.append(subprocess.Popen(['sleep', '3600']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark process collection")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--ticks', type=int, default=5)
+    args = parser.parse_args()
+
+    sys.addaudithook(count_opens)
+    oneshot = PsutilProcessBackend()
+    procfs = ProcfsProcessBackend()
+    children = []
+    print(f"{'processes':>10} {'legacy ms':>10} {'legacy opens':>13} {'oneshot ms':>11} {'oneshot opens':>14}"
+          f" {'procfs ms':>10} {'procfs opens':>13}")
+    try:
+        for size in sorted(args.sizes):
+            pad_process_table(children, size)
+            count = len(psutil.pids())
+            legacy_ms, legacy_opens = measure(legacy_collect, args.ticks)
+            oneshot_ms, oneshot_opens = measure(oneshot.sample, args.ticks)
+            procfs_ms, procfs_opens = measure(procfs.sample, args.ticks)
+            print(f"{count:>10} {legacy_ms:>10.1f} {legacy_opens:>13.0f} {oneshot_ms:>11.1f} {oneshot_opens:>14.0f}"
+                  f" {procfs_ms:>10.1f} {procfs_opens:>13.0f}")
+    finally:
+        for child in children:
+            child.kill()
+        for child in children:
+            child.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+'''
+    Metrics endpoint load test
+
+    Starts a MetricsExporter with one published sample and scrapes it from
+    many concurrent clients. Reports requests per second and latency, and
+    checks that every response matches the published sample and that the
+    scrapes did not make any process-table reads.
+
+    python3 benchmarks/bench_export.py --clients 200 --requests 20
+'''
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from task_manager_pro import MetricsExporter, ProcessCollector, SystemCollector
+
+
+async def client(port, path, count, latencies, bodies):
+    for _ in range(count):
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        response = await reader.read()
+        writer.close()
+        latencies.append((time.perf_counter() - start) * 1000)
+        bodies.add(response.split(b'\r\n\r\n', 1)[1])
+
+
+async def scrape(port, path, clients, requests):
+    latencies, bodies = [], set()
+    await asyncio.gather(*(client(port, path, requests, latencies, bodies) for _ in range(clients)))
+    return latencies, bodies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the metrics endpoint")
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=20, help="requests per client")
+    args = parser.parse_args()
+
+    collector = ProcessCollector()
+    exporter = MetricsExporter(port=0)
+    exporter.start()
+    exporter.publish(SystemCollector().sample(), collector.sample())
+
+    # A process-table read triggered by a scrape would show up here
+    reads = {'count': 0}
+    original = collector.backend.read_processes
+
+    def counted():
+        reads['count'] += 1
+        original()
+    collector.backend.read_processes = counted
+
+    try:
+        for path in ('/metrics', '/metrics.json'):
+            start = time.perf_counter()
+            latencies, bodies = asyncio.run(scrape(exporter.port, path, args.clients, args.requests))
+            elapsed = time.perf_counter() - start
+            latencies.sort()
+            print(f"{path:>14}: {len(latencies) / elapsed:,.0f} req/s, p50 {statistics.median(latencies):.2f} ms, "
+                  f"p95 {latencies[int(len(latencies) * 0.95)]:.2f} ms, {len(bodies)} distinct bodies")
+    finally:
+        exporter.stop()
+
+    print(f"process-table reads during scrapes: {reads['count']}")
+    if reads['count'] or len(bodies) != 1:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+'''
+    Cold-start benchmark
+
+    Starts task_manager_pro.py with --startup-only several times and
+    reports the median time to the first headless record and, when a
+    display is available, to the first GUI frame.
+
+    python3 benchmarks/bench_startup.py --runs 5
+'''
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'task_manager_pro.py')
+STARTUP_LINE = re.compile(r"after (\d+) ms from exec, (\d+) ms from import")
+
+
+def measure(mode_args, runs):
+    """Median (from exec, from import) milliseconds over `runs` cold starts"""
+    from_exec, from_import = [], []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, SCRIPT, '--startup-only', '--metrics-dir', ''] + mode_args,
+            capture_output=True, text=True, check=True
+        )
+        match = STARTUP_LINE.search(result.stderr)
+        from_exec.append(int(match.group(1)))
+        from_import.append(int(match.group(2)))
+    return statistics.median(from_exec), statistics.median(from_import)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold-start time")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    modes = [('headless', ['--headless'])]
+    if os.environ.get('DISPLAY'):
+        modes.append(('gui', []))
+    else:
+        print("DISPLAY not set, skipping GUI mode (run under xvfb-run to include it)")
+
+    for name, mode_args in modes:
+        from_exec, from_import = measure(mode_args, args.runs)
+        print(f"{name:>9}: {from_exec:.0f} ms from exec, {from_import:.0f} ms from import")
+
+
+if __name__ == "__main__":
+    main()
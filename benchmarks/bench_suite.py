@@ -0,0 +1,548 @@
+'''
+    Reproducible benchmark suite
+
+    Runs the process collection and process list paths against a synthetic
+    process table, so results do not depend on what the host is doing and
+    can be compared between commits. Every size is generated from a fixed
+    seed; each tick exits and spawns `--churn` of the table and moves the
+    CPU counters of about a fifth of it.
+
+    Two sources are measured:
+
+      procfs  a synthetic /proc tree in a temporary directory, read by the
+              real ProcfsProcessBackend parser
+      fake    the same table handed straight to ProcessBackend.add_process,
+              so only snapshot building is timed (no file I/O)
+
+    After each collect tick the snapshot goes through the process list path:
+    ProcessIndex sorting, filtering and top-K, the tree view with its
+    rollups, the per-process history and the windowed row diff. A seeded
+    system sample then goes through update_system_ui, which blits the
+    performance charts, and the network chart is blitted too.
+
+    By default the row diff runs against a stand-in Treeview and the charts
+    draw into Agg canvases, so no display is needed. With --tk both run
+    inside a real ModernUbuntuTaskManager (use xvfb-run on a machine without
+    a display). Either way the render stage times only the row diff and
+    redraw, so the two modes measure the same work.
+
+    python3 benchmarks/bench_suite.py --sizes 1000 10000 50000 --output results.json
+    python3 benchmarks/bench_suite.py --compare results.json
+
+    Output is JSON: per-stage p50/p95/max/mean milliseconds per tick, plus
+    RSS and the peak Python allocation of one tick.
+'''
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+import psutil
+import task_manager_pro
+from task_manager_pro import (
+    BlitChartRenderer, ModernUbuntuTaskManager, ProcessBackend, ProcfsProcessBackend, ProcessHistoryStore,
+    ProcessIndex, RingBuffer, PROCESS_TOP_K
+)
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+MEM_TOTAL = 16 * 1024 ** 3
+STATES = 'RSSSSSSSSSSDIZT'
+NAMES = ['bash', 'python3', 'sshd', 'nginx', 'postgres', 'kworker/0:1', 'systemd-journal', 'chromium-browse', 'node', 'java']
+NICS = ['lo', 'eth0', 'wlan0', 'docker0']
+HISTORY_LENGTH = 50
+
+
+class SyntheticProcesses:
+    """A seeded process table that exits, spawns and burns CPU tick by tick"""
+
+    def __init__(self, size, churn, threads, seed):
+        self.rng = random.Random(seed)
+        self.churn = churn
+        self.threads = threads
+        self.uptime = 100000.0
+        self.next_pid = 2
+        # pid -> [ppid, name, state, ticks, threads, start ticks, rss pages]
+        self.procs = {1: [0, 'systemd', 'S', 5000, 1, 1, 3000]}
+        while len(self.procs) < size:
+            self.spawn()
+
+    def spawn(self):
+        pid = self.next_pid
+        self.next_pid += 1
+        # Mostly shallow trees: parents come from the first few hundred processes
+        parents = list(self.procs)
+        ppid = self.rng.choice(parents[:300]) if self.rng.random() < 0.9 else self.rng.choice(parents)
+        threads = max(1, int(self.rng.expovariate(1 / self.threads)))
+        start = int(self.uptime * CLOCK_TICKS) - self.rng.randrange(1, 10000)
+        self.procs[pid] = [
+            ppid, self.rng.choice(NAMES), self.rng.choice(STATES), self.rng.randrange(0, 2000),
+            threads, start, self.rng.randrange(100, 50000)
+        ]
+        return pid
+
+    def tick(self, seconds=1.0):
+        """Advance one tick; return (exited, changed) PIDs, where changed includes spawned ones"""
+        self.uptime += seconds
+        count = int(len(self.procs) * self.churn)
+        exited = self.rng.sample([pid for pid in self.procs if pid != 1], count)
+        for pid in exited:
+            del self.procs[pid]
+        exited_set = set(exited)
+        changed = set()
+        # Orphans are re-parented to init, like the kernel does
+        for pid, proc in self.procs.items():
+            if proc[0] in exited_set:
+                proc[0] = 1
+                changed.add(pid)
+        for _ in range(count):
+            changed.add(self.spawn())
+        for pid in self.rng.sample(list(self.procs), len(self.procs) // 5):
+            proc = self.procs[pid]
+            proc[3] += self.rng.randrange(0, int(seconds * CLOCK_TICKS) + 1)
+            proc[2] = self.rng.choice(STATES)
+            changed.add(pid)
+        return exited, changed
+
+
+class SyntheticSystem:
+    """Seeded system samples shaped like SystemCollector.sample(), drifting tick by tick"""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.cpu, self.mem, self.disk = 20.0, 40.0, 60.0
+
+    def sample(self):
+        self.cpu = min(100.0, max(0.0, self.cpu + self.rng.uniform(-15, 15)))
+        self.mem = min(100.0, max(0.0, self.mem + self.rng.uniform(-1, 1)))
+        self.disk = min(100.0, self.disk + self.rng.uniform(0, 0.01))
+        # Bursty traffic, so the network chart rescales now and then
+        net = {nic: (self.rng.expovariate(1 / 200000), self.rng.expovariate(1 / 800000)) for nic in NICS}
+        return {'cpu': self.cpu, 'mem': self.mem, 'disk': self.disk, 'net': net}
+
+
+class SyntheticProcRoot:
+    """Mirrors a SyntheticProcesses table as /proc-style files under a directory"""
+
+    def __init__(self, model, directory):
+        self.model = model
+        self.directory = directory
+        with open(os.path.join(directory, 'meminfo'), 'w') as f:
+            f.write(f"MemTotal:       {MEM_TOTAL // 1024} kB\n")
+        self.write_uptime()
+        for pid in model.procs:
+            os.mkdir(os.path.join(directory, str(pid)))
+            self.write_stat(pid)
+
+    def write_uptime(self):
+        with open(os.path.join(self.directory, 'uptime'), 'w') as f:
+            f.write(f"{self.model.uptime:.2f} {self.model.uptime * 2:.2f}\n")
+
+    def write_stat(self, pid):
+        ppid, name, state, ticks, threads, start, rss = self.model.procs[pid]
+        utime, stime = ticks * 2 // 3, ticks - ticks * 2 // 3
+        with open(os.path.join(self.directory, str(pid), 'stat'), 'w') as f:
+            f.write(
+                f"{pid} ({name}) {state} {ppid} {pid} {pid} 0 -1 4194304 100 0 0 0 {utime} {stime} 0 0 20 0 "
+                f"{threads} 0 {start} {rss * PAGE_SIZE * 4} {rss} 18446744073709551615 0 0 0 0 0 0 0 0 0 0 0 0 17 0 0 0\n"
+            )
+        if len(name) == 15:
+            with open(os.path.join(self.directory, str(pid), 'cmdline'), 'wb') as f:
+                f.write(f"/usr/bin/{name}\0--type=renderer\0".encode())
+
+    def apply(self, exited, changed):
+        for pid in exited:
+            shutil.rmtree(os.path.join(self.directory, str(pid)))
+        for pid in changed:
+            os.makedirs(os.path.join(self.directory, str(pid)), exist_ok=True)
+            self.write_stat(pid)
+        self.write_uptime()
+
+
+class SyntheticProcessBackend(ProcessBackend):
+    """Feeds a SyntheticProcesses table through add_process, with no file I/O"""
+
+    def __init__(self, model):
+        self.model = model
+        self._ticks = {}
+
+    def read_processes(self):
+        ticks = {}
+        for pid, (ppid, name, state, total, threads, start, rss) in sorted(self.model.procs.items()):
+            self.process_counts['total'] += 1
+            iid = f"{pid}:{start}"
+            previous = self._ticks.get(iid, total)
+            ticks[iid] = total
+            self.add_process(
+                iid, pid, ppid, name,
+                (total - previous) / CLOCK_TICKS * 100,
+                rss * PAGE_SIZE / MEM_TOTAL * 100,
+                rss * PAGE_SIZE,
+                threads,
+                task_manager_pro.PROC_STATES.get(state, 'unknown')
+            )
+        self._ticks = ticks
+
+
+class FakeWidget:
+    def config(self, **kwargs):
+        pass
+
+    def set(self, *args):
+        pass
+
+    def get(self):
+        return False
+
+    def __setitem__(self, key, value):
+        pass
+
+
+class FakeNotebook:
+    """Reports a fixed tab as selected"""
+
+    def __init__(self, selected):
+        self.selected = selected
+
+    def select(self):
+        return self.selected
+
+
+class FakeTreeview:
+    """The Treeview calls the row diff makes, counted instead of drawn"""
+
+    def __init__(self):
+        self.rows = {}
+        self.calls = 0
+
+    def insert(self, parent, index, iid, values):
+        self.rows[iid] = values
+        self.calls += 1
+
+    def delete(self, *iids):
+        for iid in iids:
+            del self.rows[iid]
+        self.calls += 1
+
+    def move(self, iid, parent, index):
+        self.calls += 1
+
+    def item(self, iid, values=None):
+        self.rows[iid] = values
+        self.calls += 1
+
+    def selection(self):
+        return ()
+
+    def selection_set(self, iid):
+        self.calls += 1
+
+
+class HeadlessProcessView:
+    """Just enough of ModernUbuntuTaskManager for its process list methods to run without Tk"""
+
+    apply_process_rows = ModernUbuntuTaskManager.apply_process_rows
+    render_process_window = ModernUbuntuTaskManager.render_process_window
+
+    def __init__(self, visible_rows=30):
+        self.process_rows = {}
+        self.process_index = ProcessIndex()
+        self.process_snapshot = None
+        self.process_order = np.empty(0, dtype=np.int64)
+        self.process_offset = 0
+        self.visible_process_rows = visible_rows
+        self.selected_process_iid = None
+        self.process_tree = FakeTreeview()
+        self.process_scrollbar = FakeWidget()
+        self.tree_calls_label = FakeWidget()
+        self.instrumentation = task_manager_pro.Instrumentation()
+
+
+class HeadlessChartView:
+    """Just enough of ModernUbuntuTaskManager for update_system_ui to blit its charts into Agg canvases"""
+
+    update_system_ui = ModernUbuntuTaskManager.update_system_ui
+    update_network_history = ModernUbuntuTaskManager.update_network_history
+    render_visible_charts = ModernUbuntuTaskManager.render_visible_charts
+
+    def __init__(self, history_length=HISTORY_LENGTH):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.history_length = history_length
+        self.cpu_history = RingBuffer(history_length)
+        self.mem_history = RingBuffer(history_length)
+        self.disk_history = RingBuffer(history_length)
+        self.network_history = {'sent': RingBuffer(history_length), 'recv': RingBuffer(history_length)}
+        self.nic_history = {}
+        self.nic_lines = {}
+        self.metrics_store = None
+        self.alert_engine = None
+        self.exporter = None
+        self.process_snapshot = None
+        self.instrumentation = task_manager_pro.Instrumentation()
+        self.replay_var = FakeWidget()
+        for name in ('mem_progress', 'mem_usage_label', 'disk_progress', 'disk_usage_label', 'network_rate_label',
+                     'performance_frame_label', 'network_frame_label'):
+            setattr(self, name, FakeWidget())
+
+        # Same figure layout as the Performance and Network tabs
+        self.fig = Figure(figsize=(10, 8))
+        self.fig.suptitle('System Performance')
+        lines = []
+        for i, title in enumerate(('CPU Usage', 'Memory Usage', 'Disk Usage')):
+            ax = self.fig.add_subplot(3, 1, i + 1)
+            ax.set_title(title)
+            ax.set_ylim(0, 100)
+            ax.set_xticks([])
+            lines.append(ax.plot(np.zeros(history_length))[0])
+        self.line1, self.line2, self.line3 = lines
+        self.performance_renderer = BlitChartRenderer(FigureCanvasAgg(self.fig), lines)
+
+        self.network_fig = Figure(figsize=(10, 4))
+        self.network_ax = self.network_fig.add_subplot(1, 1, 1)
+        self.network_ax.set_ylim(0, 1)
+        self.network_sent_line, = self.network_ax.plot(self.network_history['sent'].view(), label='Sent (total)', linewidth=2)
+        self.network_recv_line, = self.network_ax.plot(self.network_history['recv'].view(), label='Received (total)', linewidth=2)
+        self.network_ax.legend(loc='upper left', fontsize='small')
+        self.network_renderer = BlitChartRenderer(
+            FigureCanvasAgg(self.network_fig), [self.network_sent_line, self.network_recv_line],
+            rescale_axes=[self.network_ax]
+        )
+
+        # update_system_ui blits the performance charts; the network chart is blitted separately
+        self.performance_frame, self.network_frame = 'performance', 'network'
+        self.notebook = FakeNotebook(self.performance_frame)
+
+
+def timed(stages, stage, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    stages.setdefault(stage, []).append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def process_list_path(stages, view, history, snapshot, render):
+    """Everything the process tab does with a snapshot, one timed stage at a time"""
+    index = view.process_index
+    timed(stages, 'index_update', index.set_snapshot, snapshot)
+
+    index.tree_mode, index.top_k, index.filter_text = False, None, ''
+    index.sort_column, index.descending = 'CPU %', True
+    order = timed(stages, 'sort_cpu', index.order)
+    index.sort_column = 'Name'
+    timed(stages, 'sort_name', index.order)
+    index.filter_text = 'py'
+    timed(stages, 'filter', index.order)
+    index.filter_text, index.top_k = '', PROCESS_TOP_K
+    timed(stages, 'top_k', index.order)
+
+    index.top_k, index.tree_mode = None, True
+    index.totals = None
+    timed(stages, 'tree', index.order)
+    index.tree_mode = False
+    index.sort_column = 'CPU %'
+
+    timed(stages, 'history', history.record, snapshot, ())
+    # The index is back in its sort_cpu state, so that order is what the list shows
+    timed(stages, 'render', render, snapshot, index, order)
+
+
+def chart_path(stages, charts, system):
+    """A system sample through update_system_ui and its chart blit, then the network chart blit"""
+    timed(stages, 'system_ui', charts.update_system_ui, system)
+    timed(stages, 'network_chart', charts.network_renderer.render)
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        'p50': round(statistics.median(ordered), 3),
+        'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        'max': round(ordered[-1], 3),
+        'mean': round(statistics.fmean(ordered), 3)
+    }
+
+
+def make_renderer(tk_app):
+    """Callable that runs only the row diff and redraw of an already ordered snapshot, headless or in Tk"""
+    target = HeadlessProcessView() if tk_app is None else tk_app
+
+    def render(snapshot, index, order):
+        # The benchmark's index stands in for the app's own; the live sampler is stopped
+        target.process_snapshot = snapshot
+        target.process_index = index
+        target.process_order = order
+        target.render_process_window()
+        if tk_app is not None:
+            tk_app.master.update_idletasks()
+    return render
+
+
+def make_charts(tk_app):
+    """Object whose update_system_ui blits the performance charts, headless or in Tk"""
+    if tk_app is None:
+        return HeadlessChartView()
+    tk_app.notebook.select(tk_app.performance_frame)
+    tk_app.master.update()
+    return tk_app
+
+
+def run_scenario(source, size, churn, threads, ticks, seed, tk_app=None):
+    model = SyntheticProcesses(size, churn, threads, seed)
+    directory = None
+    try:
+        if source == 'procfs':
+            directory = tempfile.mkdtemp(prefix='bench_proc_')
+            proc_root = SyntheticProcRoot(model, directory)
+            backend = ProcfsProcessBackend(proc_root=directory)
+        else:
+            proc_root = None
+            backend = SyntheticProcessBackend(model)
+
+        view = HeadlessProcessView()
+        history = ProcessHistoryStore(capacity=256, length=120)
+        render = make_renderer(tk_app)
+        charts = make_charts(tk_app)
+        system = SyntheticSystem(seed)
+        stages = {}
+
+        def advance():
+            exited, changed = model.tick()
+            if proc_root is not None:
+                proc_root.apply(exited, changed)
+
+        # Warm-up tick seeds the CPU baselines, the history LRU and the chart backgrounds
+        process_list_path({}, view, history, backend.sample(), render)
+        chart_path({}, charts, system.sample())
+        rss_before = psutil.Process().memory_info().rss
+        for _ in range(ticks):
+            advance()
+            snapshot = timed(stages, 'collect', backend.sample)
+            process_list_path(stages, view, history, snapshot, render)
+            chart_path(stages, charts, system.sample())
+        rss_after = psutil.Process().memory_info().rss
+
+        # One more tick under tracemalloc for the allocation peak; not timed
+        advance()
+        tracemalloc.start()
+        process_list_path({}, view, history, backend.sample(), render)
+        chart_path({}, charts, system.sample())
+        alloc_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        if directory:
+            shutil.rmtree(directory)
+
+    total = [sum(tick) for tick in zip(*stages.values())]
+    return {
+        'source': source,
+        'processes': size,
+        'churn': churn,
+        'threads': threads,
+        'ticks': ticks,
+        'renderer': 'tk' if tk_app is not None else 'headless',
+        'stages': {stage: summarize(samples) for stage, samples in stages.items()},
+        'tick_total': summarize(total),
+        'rss_mb': round(rss_after / 1024 ** 2, 1),
+        'rss_growth_mb': round((rss_after - rss_before) / 1024 ** 2, 1),
+        'tick_alloc_peak_mb': round(alloc_peak / 1024 ** 2, 2)
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_tk_app():
+    task_manager_pro.import_gui()
+    root = task_manager_pro.tk.Tk()
+    app = ModernUbuntuTaskManager(root, metrics_dir=None)
+    # Snapshots come from the benchmark, not from the live sampler
+    app.scheduler.stop()
+    root.update()
+    return app
+
+
+def compare(baseline, current):
+    """Print p50 tick time per scenario against a previous run"""
+    old = {(r['source'], r['processes'], r['renderer']): r for r in baseline['results']}
+    print(f"{'scenario':>24} {'stage':>12} {'before ms':>10} {'after ms':>10} {'change':>8}")
+    for result in current['results']:
+        key = (result['source'], result['processes'], result['renderer'])
+        if key not in old:
+            continue
+        before, after = old[key], result
+        names = ['tick_total'] + sorted(after['stages'].keys() & before['stages'].keys())
+        for stage in names:
+            a = before[stage] if stage == 'tick_total' else before['stages'][stage]
+            b = after[stage] if stage == 'tick_total' else after['stages'][stage]
+            change = (b['p50'] - a['p50']) / a['p50'] * 100 if a['p50'] else 0.0
+            print(f"{'/'.join(map(str, key)):>24} {stage:>12} {a['p50']:>10.2f} {b['p50']:>10.2f} {change:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark collection and the process list on a synthetic process table")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--sources', nargs='+', choices=['procfs', 'fake'], default=['procfs', 'fake'])
+    parser.add_argument('--churn', type=float, default=0.01, help="fraction of processes replaced per tick")
+    parser.add_argument('--threads', type=float, default=4.0, help="mean threads per process")
+    parser.add_argument('--ticks', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--tk', action='store_true', help="render into a real Tk window (needs a display)")
+    parser.add_argument('--output', help="write JSON here instead of stdout")
+    parser.add_argument('--compare', metavar='BASELINE', help="print p50 changes against an earlier JSON result")
+    args = parser.parse_args()
+
+    tk_app = make_tk_app() if args.tk else None
+    results = []
+    try:
+        for size in args.sizes:
+            for source in args.sources:
+                print(f"{source} x {size}...", file=sys.stderr)
+                results.append(run_scenario(source, size, args.churn, args.threads, args.ticks, args.seed, tk_app))
+    finally:
+        if tk_app is not None:
+            tk_app.master.destroy()
+
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': args.seed,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+'''
+    Backend parity check
+
+    Samples the process table with PsutilProcessBackend and
+    ProcfsProcessBackend back to back and compares every column the
+    process list shows. Exits non-zero if the backends disagree on more
+    than a handful of processes (some churn between the two reads is
+    expected on a busy host).
+
+    python3 benchmarks/check_backend_parity.py
+'''
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from task_manager_pro import PsutilProcessBackend, ProcfsProcessBackend
+
+
+def by_pid(snapshot):
+    return {
+        int(pid): (snapshot.names[i], float(snapshot.cpu[i]), float(snapshot.mem[i]),
+                   int(snapshot.threads[i]), snapshot.statuses[i], int(snapshot.ppids[i]))
+        for i, pid in enumerate(snapshot.pids)
+    }
+
+
+def compare(psutil_rows, procfs_rows, cpu_tolerance, mem_tolerance):
+    """Return a list of (pid, column, psutil value, procfs value) mismatches"""
+    mismatches = []
+    for pid in psutil_rows.keys() & procfs_rows.keys():
+        name_a, cpu_a, mem_a, threads_a, status_a, ppid_a = psutil_rows[pid]
+        name_b, cpu_b, mem_b, threads_b, status_b, ppid_b = procfs_rows[pid]
+        if name_a != name_b:
+            mismatches.append((pid, 'Name', name_a, name_b))
+        if abs(cpu_a - cpu_b) > cpu_tolerance:
+            mismatches.append((pid, 'CPU %', cpu_a, cpu_b))
+        if abs(mem_a - mem_b) > mem_tolerance:
+            mismatches.append((pid, 'Memory %', mem_a, mem_b))
+        if ppid_a != ppid_b:
+            mismatches.append((pid, 'PPID', ppid_a, ppid_b))
+        if threads_a != threads_b:
+            mismatches.append((pid, 'Threads', threads_a, threads_b))
+        # Running/sleeping flips between two reads are normal for busy processes
+        if status_a != status_b and {status_a, status_b} != {'running', 'sleeping'}:
+            mismatches.append((pid, 'Status', status_a, status_b))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the psutil and /proc process backends")
+    parser.add_argument('--interval', type=float, default=1.0)
+    parser.add_argument('--cpu-tolerance', type=float, default=5.0)
+    parser.add_argument('--mem-tolerance', type=float, default=0.1)
+    parser.add_argument('--max-mismatches', type=int, default=3)
+    args = parser.parse_args()
+
+    psutil_backend = PsutilProcessBackend()
+    procfs_backend = ProcfsProcessBackend()
+
+    # First tick seeds the CPU baselines, the second one is compared
+    psutil_backend.sample()
+    procfs_backend.sample()
+    time.sleep(args.interval)
+    psutil_snapshot = psutil_backend.sample()
+    procfs_snapshot = procfs_backend.sample()
+
+    psutil_rows = by_pid(psutil_snapshot)
+    procfs_rows = by_pid(procfs_snapshot)
+    mismatches = compare(psutil_rows, procfs_rows, args.cpu_tolerance, args.mem_tolerance)
+    only_one = psutil_rows.keys() ^ procfs_rows.keys()
+
+    print(f"psutil: {len(psutil_rows)} processes in {psutil_snapshot.collect_ms:.1f} ms")
+    print(f"procfs: {len(procfs_rows)} processes in {procfs_snapshot.collect_ms:.1f} ms")
+    print(f"PIDs seen by only one backend: {len(only_one)}")
+    for pid, column, a, b in sorted(mismatches):
+        print(f"  PID {pid} {column}: psutil={a!r} procfs={b!r}")
+
+    if len(mismatches) + len(only_one) > args.max_mismatches:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+'''
+    Speed test check
+
+    Runs the speed test against the built-in stand-in server, so no network
+    is needed, and checks that:
+
+      - a second start while a test is running is refused
+      - progress arrives incrementally and the test completes
+      - cancelling stops the worker quickly
+      - the sampling scheduler keeps its rate while a test is running
+
+    python3 benchmarks/check_speedtest.py --rate 200
+'''
+
+import argparse
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from task_manager_pro import (
+    SamplingScheduler, SpeedTestRunner, SpeedTestServer, ProcessCollector, CpuCollector, SystemCollector
+)
+
+
+def drain(results):
+    """Speed test events from the shared results queue; collector samples are dropped"""
+    events = []
+    while True:
+        try:
+            name, value = results.get_nowait()
+        except queue.Empty:
+            return events
+        if name == 'speedtest':
+            events.append(value)
+
+
+def sample_rates(scheduler, seconds):
+    """Runs, skipped deadlines and p95 sample time per collector over `seconds`"""
+    before = {job.collector.name: (job.runs, job.skipped) for job in scheduler.jobs}
+    times = {job.collector.name: [] for job in scheduler.jobs}
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        for job in scheduler.jobs:
+            times[job.collector.name].append(job.last_ms)
+        time.sleep(0.05)
+    return {
+        job.collector.name: (
+            job.runs - before[job.collector.name][0],
+            job.skipped - before[job.collector.name][1],
+            sorted(times[job.collector.name])[int(len(times[job.collector.name]) * 0.95)]
+        )
+        for job in scheduler.jobs
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the speed test against a local stand-in server")
+    parser.add_argument('--rate', type=float, default=200, help="stand-in server throughput in Mbit/s")
+    parser.add_argument('--seconds', type=float, default=4.0, help="sampler measurement window")
+    args = parser.parse_args()
+
+    server = SpeedTestServer(rate=args.rate * 1_000_000 / 8)
+    server.start()
+    scheduler = SamplingScheduler()
+    for collector in (ProcessCollector(interval=1.0), CpuCollector(interval=0.25), SystemCollector(interval=1.0)):
+        scheduler.add(collector)
+    scheduler.start()
+    runner = SpeedTestRunner(scheduler.results, server.url)
+    failures = []
+
+    try:
+        # Let the first, back-to-back samples settle before measuring
+        time.sleep(1.0)
+        idle = sample_rates(scheduler, args.seconds)
+
+        if not runner.start() or runner.start():
+            failures.append("single-flight guard did not refuse a second start")
+        busy = sample_rates(scheduler, args.seconds)
+        while runner.running:
+            time.sleep(0.1)
+        events = drain(scheduler.results)
+        progress = [event for event in events if event['phase'] in ('download', 'upload')]
+        print(f"progress updates: {len(progress)}, outcome: {events[-1]['phase']}")
+        if events[-1]['phase'] != 'done':
+            failures.append(f"test did not complete: {events[-1]}")
+        else:
+            print(f"download {events[-1]['download']:.1f} Mbps, upload {events[-1]['upload']:.1f} Mbps, "
+                  f"ping {events[-1]['ping']:.2f} ms")
+        if len(progress) < 4:
+            failures.append("too few progress updates")
+
+        # Cancel against a slow link, so the test is always mid-transfer
+        runner.stop()
+        slow = SpeedTestServer(rate=10 * 1_000_000 / 8)
+        slow.start()
+        runner = SpeedTestRunner(scheduler.results, slow.url)
+        runner.start()
+        time.sleep(1.0)
+        start = time.perf_counter()
+        runner.cancel()
+        runner._thread.join(5)
+        cancel_ms = (time.perf_counter() - start) * 1000
+        slow.stop()
+        events = drain(scheduler.results)
+        print(f"cancelled in {cancel_ms:.0f} ms, outcome: {events[-1]['phase']}")
+        if events[-1]['phase'] != 'cancelled' or cancel_ms > 1000:
+            failures.append("cancel was slow or not reported")
+
+        print(f"{'collector':>12} {'idle runs':>10} {'busy runs':>10} {'busy skipped':>13} {'idle p95 ms':>12} {'busy p95 ms':>12}")
+        for job in scheduler.jobs:
+            name = job.collector.name
+            print(f"{name:>12} {idle[name][0]:>10} {busy[name][0]:>10} {busy[name][1]:>13}"
+                  f" {idle[name][2]:>12.2f} {busy[name][2]:>12.2f}")
+            # Window edges can cost one run either way; a missed deadline cannot be explained by them
+            expected = int(args.seconds / job.collector.interval.interval)
+            if busy[name][1] or busy[name][0] < expected - 1:
+                failures.append(f"{name} fell behind during the speed test")
+    finally:
+        runner.stop()
+        scheduler.stop()
+        server.stop()
+
+    for failure in failures:
+        print(f"  {failure}")
+    print("FAIL" if failures else "OK")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -26,22 +26,1969 @@
 
 
 #!/usr/bin/env python3
-import tkinter as tk
-from tkinter import ttk, messagebox
+import time
+# Taken before the heavy imports so --report-startup covers them
+IMPORT_STARTED = time.perf_counter()
+
 import psutil
 import threading
-import time
 import platform
 import os
+import sys
 import signal
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import argparse
+import csv
+import json
 import numpy as np
 import socket
-import speedtest
+import queue
+import traceback
+import operator
+from collections import namedtuple, OrderedDict, deque
+
+# GUI modules are imported by import_gui() so headless runs never load them
+tk = ttk = messagebox = plt = FigureCanvasTkAgg = None
+
+
+def import_gui():
+    """Load tkinter and matplotlib on first use"""
+    global tk, ttk, messagebox, plt, FigureCanvasTkAgg
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+
+# Immutable, column-oriented view of the process table at one point in time
+ProcessSnapshot = namedtuple('ProcessSnapshot', [
+    'timestamp', 'iids', 'pids', 'ppids', 'names', 'cpu', 'mem', 'rss', 'threads', 'statuses', 'counts', 'collect_ms'
+])
+
+
+# Every column the process table shows, fetched in one as_dict()/oneshot() pass.
+# ppid is left out: psutil re-reads stat to check for PID reuse on every ppid() call.
+PROCESS_ATTRS = ['name', 'status', 'create_time', 'cpu_percent', 'memory_info', 'num_threads', 'cpu_times']
+
+# /proc/[pid]/stat state letters, mapped to the status names psutil uses
+PROC_STATES = {
+    'R': 'running', 'S': 'sleeping', 'D': 'disk-sleep', 'T': 'stopped', 't': 'tracing-stop',
+    'Z': 'zombie', 'X': 'dead', 'x': 'dead', 'K': 'wake-kill', 'W': 'waking', 'I': 'idle', 'P': 'parked'
+}
+
+
+# Process list row height in pixels, and extra rows kept below the visible ones
+PROCESS_ROW_HEIGHT = 20
+PROCESS_OVERSCAN = 10
+
+# Rows kept by the "Top K by CPU" mode
+PROCESS_TOP_K = 50
+
+
+class RingBuffer:
+    """Fixed-capacity history with O(1) appends and zero-copy, oldest-first views"""
+
+    def __init__(self, capacity, fill=0.0, dtype=np.float64):
+        self.capacity = capacity
+        # Every value is written twice, so the last `capacity` samples are always one contiguous slice
+        self._data = np.full(capacity * 2, fill, dtype=dtype)
+        self._head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.capacity
+
+    def append(self, value):
+        self._data[self._head] = value
+        self._data[self._head + self.capacity] = value
+        self._head = (self._head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self):
+        return self._data[self._head + self.capacity - 1]
+
+    def view(self):
+        """Read-only view of the samples, oldest first; no copy is made"""
+        window = self._data[self._head:self._head + self.capacity]
+        window.flags.writeable = False
+        return window
+
+
+class NetworkThroughput:
+    """Per-interface send/receive rates in bytes per second, computed from counter deltas"""
+
+    # 32-bit counters that drop from above this fraction of their range have wrapped
+    WRAP_THRESHOLD = 0.75
+
+    def __init__(self):
+        # nic -> (monotonic time, bytes_sent, bytes_recv) from the previous sample
+        self._last = {}
+
+    @classmethod
+    def delta(cls, old, new):
+        """Counter increase, treating a drop as a 32-bit wrap or an interface reset"""
+        if new >= old:
+            return new - old
+        if old < 2 ** 32 and old > 2 ** 32 * cls.WRAP_THRESHOLD:
+            return new + 2 ** 32 - old
+        # Interface was reset (down/up, driver reload); counting restarted at zero
+        return new
+
+    def update(self, counters, now=None):
+        """Take a psutil.net_io_counters(pernic=True) result; return {nic: (sent, recv)} rates"""
+        now = time.monotonic() if now is None else now
+        rates = {}
+        for nic, io in counters.items():
+            previous = self._last.get(nic)
+            self._last[nic] = (now, io.bytes_sent, io.bytes_recv)
+            if previous is None or now <= previous[0]:
+                # New interface: no rate until the second sample
+                rates[nic] = (0.0, 0.0)
+                continue
+            elapsed = now - previous[0]
+            rates[nic] = (
+                self.delta(previous[1], io.bytes_sent) / elapsed,
+                self.delta(previous[2], io.bytes_recv) / elapsed
+            )
+
+        # Forget interfaces that went away so a returning one starts fresh
+        for nic in [nic for nic in self._last if nic not in counters]:
+            del self._last[nic]
+        return rates
+
+    def sample(self):
+        return self.update(psutil.net_io_counters(pernic=True, nowrap=False))
+
+
+class AdaptiveInterval:
+    """Sampling interval that snaps short while a metric changes and backs off while it is idle"""
+
+    def __init__(self, min_interval, max_interval, threshold, backoff=1.5):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.threshold = threshold
+        self.backoff = backoff
+        self.interval = min_interval
+
+    def update(self, change):
+        if change > self.threshold:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        return self.interval
+
+
+class AdaptiveCollector:
+    """A metric source sampled on its own adaptive interval; subclasses implement read() and change()"""
+
+    name = None
+
+    def __init__(self, min_interval, max_interval, threshold):
+        self.interval = AdaptiveInterval(min_interval, max_interval, threshold)
+        self.last = None
+
+    def sample(self):
+        value = self.read()
+        change = float('inf') if self.last is None else self.change(self.last, value)
+        self.last = value
+        self.interval.update(change)
+        return value
+
+    def read(self):
+        raise NotImplementedError
+
+    def change(self, previous, current):
+        raise NotImplementedError
+
+
+class PerCoreCpuCollector(AdaptiveCollector):
+    """Utilisation of each logical CPU"""
+
+    name = 'percpu'
+
+    def __init__(self):
+        super().__init__(0.5, 5.0, threshold=5.0)
+        # First percpu call only sets the baseline
+        psutil.cpu_percent(percpu=True)
+
+    def read(self):
+        return psutil.cpu_percent(percpu=True)
+
+    def change(self, previous, current):
+        return max((abs(a - b) for a, b in zip(previous, current)), default=0.0)
+
+
+class DiskIOCollector(AdaptiveCollector):
+    """Per-device read/write throughput (bytes/s) and IOPS from counter deltas"""
+
+    name = 'diskio'
+    # Pseudo devices that only add noise
+    SKIP_PREFIXES = ('loop', 'ram', 'zram')
+
+    def __init__(self):
+        super().__init__(1.0, 10.0, threshold=5.0)
+        self._counters = {}
+        self._time = None
+
+    def read(self):
+        now = time.monotonic()
+        counters = psutil.disk_io_counters(perdisk=True) or {}
+        elapsed = now - self._time if self._time is not None else None
+        rates = {}
+        for disk, io in counters.items():
+            if disk.startswith(self.SKIP_PREFIXES):
+                continue
+            previous = self._counters.get(disk)
+            if previous is None or not elapsed:
+                rates[disk] = (0.0, 0.0, 0.0, 0.0)
+                continue
+            rates[disk] = (
+                max(io.read_bytes - previous.read_bytes, 0) / elapsed,
+                max(io.write_bytes - previous.write_bytes, 0) / elapsed,
+                max(io.read_count - previous.read_count, 0) / elapsed,
+                max(io.write_count - previous.write_count, 0) / elapsed
+            )
+        self._counters, self._time = counters, now
+        return rates
+
+    def change(self, previous, current):
+        # Largest swing in total IOPS on any device
+        return max(
+            (abs(sum(rate[2:]) - sum(previous.get(disk, (0.0,) * 4)[2:])) for disk, rate in current.items()),
+            default=0.0
+        )
+
+
+class MemoryCollector(AdaptiveCollector):
+    """Memory breakdown (used, cached, buffers, available) and swap"""
+
+    name = 'memory'
+
+    def __init__(self):
+        super().__init__(1.0, 10.0, threshold=0.5)
+
+    def read(self):
+        vm = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        return {
+            'total': vm.total,
+            'used': vm.used,
+            'available': vm.available,
+            'cached': getattr(vm, 'cached', 0),
+            'buffers': getattr(vm, 'buffers', 0),
+            'percent': vm.percent,
+            'swap_total': swap.total,
+            'swap_used': swap.used,
+            'swap_percent': swap.percent,
+            'swap_in': swap.sin,
+            'swap_out': swap.sout
+        }
+
+    def change(self, previous, current):
+        return max(abs(current['percent'] - previous['percent']), abs(current['swap_percent'] - previous['swap_percent']))
+
+
+class PartitionCollector(AdaptiveCollector):
+    """Mounted partitions and their usage; refreshed instead of read once at startup"""
+
+    name = 'partitions'
+
+    def __init__(self):
+        super().__init__(10.0, 120.0, threshold=0.5)
+
+    def read(self):
+        partitions = []
+        for partition in psutil.disk_partitions():
+            try:
+                usage = psutil.disk_usage(partition.mountpoint)
+            except OSError:
+                continue
+            partitions.append((partition.device, partition.mountpoint, partition.fstype, usage.total, usage.used, usage.free, usage.percent))
+        return partitions
+
+    def change(self, previous, current):
+        if [p[:2] for p in previous] != [p[:2] for p in current]:
+            return float('inf')
+        return max((abs(a[6] - b[6]) for a, b in zip(previous, current)), default=0.0)
+
+
+class FixedInterval:
+    """Constant sampling interval with the same interface as AdaptiveInterval"""
+
+    def __init__(self, interval):
+        self.interval = interval
+
+    def update(self, change):
+        return self.interval
+
+
+class CpuPercent:
+    """System-wide CPU % with its own baseline, so collectors do not reset each other's readings"""
+
+    def __init__(self):
+        self._last = psutil.cpu_times()
+
+    @staticmethod
+    def busy_and_total(times):
+        # Same accounting as psutil.cpu_percent(): guest time is already in user/nice
+        total = sum(times) - getattr(times, 'guest', 0) - getattr(times, 'guest_nice', 0)
+        return total - times.idle - getattr(times, 'iowait', 0), total
+
+    def read(self):
+        times = psutil.cpu_times()
+        busy, total = self.busy_and_total(times)
+        last_busy, last_total = self.busy_and_total(self._last)
+        self._last = times
+        if total <= last_total:
+            return 0.0
+        return min(100.0, max(0.0, (busy - last_busy) / (total - last_total) * 100))
+
+
+class CpuCollector:
+    """Aggregate CPU % for the live progress bar"""
+
+    name = 'cpu'
+
+    def __init__(self, interval=0.25):
+        self.interval = FixedInterval(interval)
+        self.cpu = CpuPercent()
+
+    def sample(self):
+        return self.cpu.read()
+
+
+class SystemCollector:
+    """CPU, memory, disk and network readings that feed the histories and charts"""
+
+    name = 'system'
+
+    def __init__(self, interval=1.0, disk_interval=5.0):
+        self.interval = FixedInterval(interval)
+        self.cpu = CpuPercent()
+        self.throughput = NetworkThroughput()
+        # Disk usage barely moves, so it is re-read less often than the rest
+        self.disk_interval = disk_interval
+        self._disk = None
+        self._disk_time = None
+
+    def sample(self):
+        now = time.monotonic()
+        if self._disk_time is None or now - self._disk_time >= self.disk_interval:
+            self._disk = psutil.disk_usage('/').percent
+            self._disk_time = now
+        return {
+            'cpu': self.cpu.read(),
+            'mem': psutil.virtual_memory().percent,
+            'disk': self._disk,
+            'net': self.throughput.sample()
+        }
+
+
+class Instrumentation:
+    """Rolling per-stage timings for the Diagnostics tab, plus an on-demand cProfile session of the Tk thread"""
+
+    def __init__(self, window=300):
+        self.window = window
+        self.stages = {}
+        self._lock = threading.Lock()
+        self.profile = None
+        self.profile_started = None
+
+    def record(self, stage, ms):
+        with self._lock:
+            samples = self.stages.get(stage)
+            if samples is None:
+                samples = self.stages[stage] = RingBuffer(self.window, fill=np.nan)
+            samples.append(ms)
+
+    def stats(self):
+        """(stage, samples, p50, p95, max) in milliseconds, over the last `window` samples"""
+        rows = []
+        with self._lock:
+            for stage, samples in sorted(self.stages.items()):
+                recent = samples.view()[-samples.count:]
+                p50, p95 = np.percentile(recent, [50, 95])
+                rows.append((stage, samples.count, float(p50), float(p95), float(recent.max())))
+        return rows
+
+    @property
+    def profiling(self):
+        return self.profile is not None
+
+    def start_profile(self):
+        """Start profiling the calling (Tk) thread"""
+        # Python 3.12+ allows a single active profiler, so collectors are covered by the stage timings only
+        import cProfile
+        self.profile = cProfile.Profile()
+        self.profile_started = time.time()
+        self.profile.enable()
+
+    def stop_profile(self, directory):
+        """Stop the session and write <stamp>.prof plus a top-40 text summary; return the .prof path"""
+        import pstats
+        profile, self.profile = self.profile, None
+        profile.disable()
+        profile.create_stats()
+        # pstats refuses a profiler that never saw a call
+        if not profile.stats:
+            return None
+        stats = pstats.Stats(profile)
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, time.strftime('profile-%Y%m%d-%H%M%S.prof', time.localtime(self.profile_started)))
+        stats.dump_stats(path)
+        with open(path[:-len('.prof')] + '.txt', 'w') as summary:
+            stats.stream = summary
+            stats.sort_stats('cumulative').print_stats(40)
+        return path
+
+
+class ScheduledJob:
+    """A collector plus its scheduling state"""
+
+    def __init__(self, collector, next_due):
+        self.collector = collector
+        self.next_due = next_due
+        self.paused = False
+        self.runs = 0
+        self.skipped = 0
+        self.last_ms = 0.0
+
+
+class SamplingScheduler:
+    """Runs every collector on one background thread, each on its own drift-free interval, into a results queue"""
+
+    def __init__(self, instrumentation=None):
+        self.jobs = []
+        self.results = queue.Queue()
+        self.instrumentation = instrumentation
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        # CPU time spent by this thread in collectors, for the overhead readout
+        self.cpu_seconds = 0.0
+        self.started = None
+
+    def add(self, collector):
+        job = ScheduledJob(collector, time.monotonic())
+        self.jobs.append(job)
+        return job
+
+    def job(self, name):
+        for job in self.jobs:
+            if job.collector.name == name:
+                return job
+        return None
+
+    def set_paused(self, name, paused):
+        """Pause a collector, or resume it and sample straight away"""
+        job = self.job(name)
+        if job is None or job.paused == paused:
+            return
+        job.paused = paused
+        if not paused:
+            job.next_due = time.monotonic()
+            self._wake.set()
+
+    def start(self):
+        self.started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Ask the thread to finish its current sample and exit, then wait for it"""
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            for job in self.jobs:
+                if job.paused or job.next_due > now:
+                    continue
+                self.run_job(job)
+                if self._stop_event.is_set():
+                    return
+
+                interval = job.collector.interval.interval
+                job.next_due += interval
+                now = time.monotonic()
+                if job.next_due <= now:
+                    # Fell behind: drop the missed deadlines rather than piling up
+                    missed = int((now - job.next_due) // interval) + 1
+                    job.skipped += missed
+                    job.next_due += missed * interval
+
+            active = [job.next_due for job in self.jobs if not job.paused]
+            timeout = max(min(active) - time.monotonic(), 0.0) if active else None
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def run_job(self, job):
+        start = time.thread_time()
+        wall = time.perf_counter()
+        instrumentation = self.instrumentation
+        try:
+            value = job.collector.sample()
+        except (psutil.Error, OSError) as e:
+            print(f"{job.collector.name} collector failed: {e}", file=sys.stderr)
+        except Exception:
+            # A bug in one collector must not end the sampling thread for all of them
+            print(f"{job.collector.name} collector raised:", file=sys.stderr)
+            traceback.print_exc()
+        else:
+            self.results.put((job.collector.name, value))
+        job.runs += 1
+        job.last_ms = (time.perf_counter() - wall) * 1000
+        self.cpu_seconds += time.thread_time() - start
+        if instrumentation is not None:
+            instrumentation.record(f"collect: {job.collector.name}", job.last_ms)
+
+    def overhead(self):
+        """CPU used by collectors as a percentage of one core since start"""
+        elapsed = time.monotonic() - self.started if self.started else 0
+        return self.cpu_seconds / elapsed * 100 if elapsed > 0 else 0.0
+
+
+class BlitChartRenderer:
+    """Redraws only the line artists of a figure over a cached static background"""
+
+    def __init__(self, canvas, lines, rescale_axes=()):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self.lines = lines
+        # Axes whose y-limits follow the data; changing them needs a full redraw
+        self.rescale_axes = rescale_axes
+        self._background = None
+
+        # Frame-time counters
+        self.frame_ms = 0.0
+        self.avg_frame_ms = 0.0
+        self.frames = 0
+
+        for line in lines:
+            line.set_animated(True)
+        # Any full draw (first show, resize, limit change) re-captures the background
+        canvas.mpl_connect('draw_event', self.on_draw)
+
+    def add_line(self, line):
+        """Start animating a new line; the legend changed, so redraw everything once"""
+        line.set_animated(True)
+        self.lines.append(line)
+        self._background = None
+
+    def remove_line(self, line):
+        """Stop drawing a line and take it off its axes; the legend changed, so redraw everything once"""
+        self.lines.remove(line)
+        line.remove()
+        self._background = None
+
+    def on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_lines()
+
+    def draw_lines(self):
+        for line in self.lines:
+            line.axes.draw_artist(line)
+
+    def rescale(self):
+        """Grow or shrink y-limits to fit the data; return True if any axes changed"""
+        changed = False
+        for ax in self.rescale_axes:
+            peak = max((float(np.max(line.get_ydata())) for line in ax.get_lines()), default=0.0)
+            bottom, top = ax.get_ylim()
+            if peak > top or (top > 1 and peak < top / 4):
+                ax.set_ylim(bottom, max(peak * 1.25, 1))
+                changed = True
+        return changed
+
+    def render(self):
+        start = time.perf_counter()
+        if self.rescale() or self._background is None:
+            # draw_event handler caches the new background and draws the lines
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._background)
+            self.draw_lines()
+            self.canvas.blit(self.figure.bbox)
+
+        self.frame_ms = (time.perf_counter() - start) * 1000
+        self.frames += 1
+        self.avg_frame_ms += (self.frame_ms - self.avg_frame_ms) / min(self.frames, 20)
+
+    def describe(self, interval=1.0):
+        """Frame time and the share of one core it costs at the given refresh interval"""
+        share = self.avg_frame_ms / (interval * 1000) * 100
+        return f"Render: {self.frame_ms:.1f} ms/frame (avg {self.avg_frame_ms:.1f} ms, {share:.2f}% of one core)"
+
+
+# Processes kept per metrics record, and the on-disk record layout
+METRICS_TOP_N = 5
+METRICS_DTYPE = np.dtype([
+    ('timestamp', 'f8'),
+    ('cpu', 'f4'),
+    ('mem', 'f4'),
+    ('disk', 'f4'),
+    ('net_sent', 'f4'),
+    ('net_recv', 'f4'),
+    ('top_pids', 'i4', (METRICS_TOP_N,)),
+    ('top_cpu', 'f4', (METRICS_TOP_N,)),
+    ('top_mem', 'f4', (METRICS_TOP_N,)),
+    ('top_names', 'S16', (METRICS_TOP_N,)),
+])
+
+
+DEFAULT_METRICS_DIR = os.path.join(os.path.expanduser('~'), '.local', 'share', 'task_manager_pro', 'metrics')
+DEFAULT_PROFILE_DIR = os.path.join(os.path.dirname(DEFAULT_METRICS_DIR), 'profiles')
+
+
+class MetricsStore:
+    """Append-only metrics history in fixed-size, memory-mapped segment files"""
+
+    def __init__(self, directory, max_segment_bytes=64 * 1024 * 1024, max_segments=30, batch_size=30):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_records = max(1, max_segment_bytes // METRICS_DTYPE.itemsize)
+        self.max_segments = max_segments
+
+        # Records are collected here and copied into the map one batch at a time
+        self.batch = np.zeros(batch_size, dtype=METRICS_DTYPE)
+        self.batch_count = 0
+
+        self._segment = None
+        self._segment_path = None
+        self._segment_used = 0
+        # path -> (read-only memmap, records used) for closed segments
+        self._readers = {}
+
+        segments = self.segments()
+        if segments:
+            mm = np.memmap(segments[-1], dtype=METRICS_DTYPE, mode='r+')
+            used = self.used_records(mm)
+            if used < len(mm):
+                self._segment, self._segment_path, self._segment_used = mm, segments[-1], used
+            else:
+                del mm
+
+    def segments(self):
+        """Segment files, oldest first"""
+        names = sorted(name for name in os.listdir(self.directory) if name.startswith('metrics-') and name.endswith('.bin'))
+        return [os.path.join(self.directory, name) for name in names]
+
+    @staticmethod
+    def used_records(mm):
+        """Written records form a prefix (timestamp > 0), so bisect instead of scanning"""
+        low, high = 0, len(mm)
+        while low < high:
+            middle = (low + high) // 2
+            if mm['timestamp'][middle] > 0:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def append(self, timestamp, cpu, mem, disk, net_sent, net_recv, top=()):
+        """Queue one record; top is a list of (pid, cpu %, memory %, name) tuples"""
+        row = self.batch[self.batch_count]
+        row['timestamp'] = timestamp
+        row['cpu'] = cpu
+        row['mem'] = mem
+        row['disk'] = disk
+        row['net_sent'] = net_sent
+        row['net_recv'] = net_recv
+        row['top_pids'] = 0
+        row['top_cpu'] = 0
+        row['top_mem'] = 0
+        row['top_names'] = b''
+        for i, (pid, proc_cpu, proc_mem, name) in enumerate(top[:METRICS_TOP_N]):
+            row['top_pids'][i] = pid
+            row['top_cpu'][i] = proc_cpu
+            row['top_mem'][i] = proc_mem
+            row['top_names'][i] = name.encode(errors='replace')[:16]
+        self.batch_count += 1
+        if self.batch_count == len(self.batch):
+            self.flush()
+
+    def flush(self):
+        """Copy the pending batch into the map, rotating segments as they fill up"""
+        pending = self.batch[:self.batch_count]
+        while len(pending):
+            if self._segment is None or self._segment_used == len(self._segment):
+                self.rotate()
+            chunk = pending[:len(self._segment) - self._segment_used]
+            self._segment[self._segment_used:self._segment_used + len(chunk)] = chunk
+            self._segment_used += len(chunk)
+            pending = pending[len(chunk):]
+        if self._segment is not None and self.batch_count:
+            self._segment.flush()
+        self.batch_count = 0
+
+    def rotate(self):
+        """Start a new segment file and drop the oldest ones past max_segments"""
+        if self._segment is not None:
+            self._segment.flush()
+            self._segment = None
+        segments = self.segments()
+        number = int(os.path.basename(segments[-1])[8:-4]) + 1 if segments else 0
+        self._segment_path = os.path.join(self.directory, f"metrics-{number:08d}.bin")
+        self._segment = np.memmap(self._segment_path, dtype=METRICS_DTYPE, mode='w+', shape=(self.segment_records,))
+        self._segment_used = 0
+
+        for path in self.segments()[:-self.max_segments]:
+            self._readers.pop(path, None)
+            os.remove(path)
+
+    def close(self):
+        self.flush()
+        self._segment = None
+        self._readers.clear()
+
+    def segment_views(self):
+        """(memmap, records used) for every segment; nothing is read until sliced"""
+        views = []
+        for path in self.segments():
+            if path == self._segment_path:
+                views.append((self._segment, self._segment_used))
+                continue
+            if path not in self._readers:
+                mm = np.memmap(path, dtype=METRICS_DTYPE, mode='r')
+                self._readers[path] = (mm, self.used_records(mm))
+            views.append(self._readers[path])
+        return views
+
+    def __len__(self):
+        return sum(used for mm, used in self.segment_views())
+
+    def read(self, start, count):
+        """Copy records [start, start + count) out of the segments that hold them"""
+        parts = []
+        for mm, used in self.segment_views():
+            if count <= 0:
+                break
+            if start >= used:
+                start -= used
+                continue
+            part = mm[start:min(used, start + count)]
+            parts.append(np.array(part))
+            count -= len(part)
+            start = 0
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=METRICS_DTYPE)
+
+
+class ProcessHistoryStore:
+    """Fixed-size per-process histories for the busiest processes, with LRU eviction of exited and idle ones"""
+
+    SERIES = ('cpu', 'rss', 'io', 'fds', 'ctx')
+
+    def __init__(self, capacity=256, length=120, admit=32):
+        self.capacity = capacity
+        self.length = length
+        # Processes admitted per snapshot; well under capacity so entries outlive a few quiet ticks
+        self.admit = admit
+        # iid -> {series: RingBuffer}, least recently active first
+        self.histories = OrderedDict()
+
+    def get(self, iid):
+        return self.histories.get(iid)
+
+    def track(self, iid):
+        """Histories for iid, created (and the LRU entry evicted) if needed"""
+        history = self.histories.get(iid)
+        if history is None:
+            while len(self.histories) >= self.capacity:
+                self.histories.popitem(last=False)
+            history = self.histories[iid] = {
+                series: RingBuffer(self.length, fill=np.nan, dtype=np.float32) for series in self.SERIES
+            }
+        self.histories.move_to_end(iid)
+        return history
+
+    def record(self, snapshot, keep=()):
+        """Append CPU/RSS for tracked processes; start tracking the top `admit` by CPU, drop exited ones"""
+        row = {iid: i for i, iid in enumerate(snapshot.iids)}
+        for iid in [iid for iid in self.histories if iid not in row]:
+            del self.histories[iid]
+
+        # The busiest processes and explicitly kept ones count as recently used
+        busy = np.flatnonzero(snapshot.cpu > 0)
+        if len(busy) > self.admit:
+            busy = busy[np.argpartition(snapshot.cpu[busy], -self.admit)[-self.admit:]]
+        for i in busy:
+            self.track(snapshot.iids[i])
+        for iid in keep:
+            if iid in row:
+                self.track(iid)
+
+        for iid, history in self.histories.items():
+            i = row[iid]
+            history['cpu'].append(snapshot.cpu[i])
+            history['rss'].append(snapshot.rss[i])
+
+    def record_detail(self, iid, io_rate, fds, ctx_rate):
+        history = self.track(iid)
+        history['io'].append(io_rate)
+        history['fds'].append(fds)
+        history['ctx'].append(ctx_rate)
+
+
+class ProcessDetailCollector:
+    """I/O, open FD and context-switch readings for the one process shown in the detail pane"""
+
+    name = 'detail'
+
+    def __init__(self, interval=1.0):
+        self.interval = FixedInterval(interval)
+        self._watch = None
+        self._iid = None
+        self._proc = None
+        self._last = None
+
+    def watch(self, iid):
+        """Called from the Tk thread; picked up on the next sample"""
+        self._watch = iid
+
+    def sample(self):
+        iid = self._watch
+        if iid is None:
+            return None
+        now = time.monotonic()
+        try:
+            if iid != self._iid:
+                self._proc = psutil.Process(int(iid.split(':')[0]))
+                self._iid = iid
+                self._last = None
+            with self._proc.oneshot():
+                io = self._proc.io_counters() if hasattr(self._proc, 'io_counters') else None
+                fds = self._proc.num_fds() if hasattr(self._proc, 'num_fds') else self._proc.num_handles()
+                ctx = self._proc.num_ctx_switches()
+        except psutil.NoSuchProcess:
+            # Exited; stop polling until another process is selected
+            self._watch = None
+            return None
+        except psutil.AccessDenied:
+            return (iid, np.nan, np.nan, np.nan)
+        io_bytes = io.read_bytes + io.write_bytes if io else 0
+        switches = ctx.voluntary + ctx.involuntary
+
+        last, self._last = self._last, (now, io_bytes, switches)
+        if last is None or now <= last[0]:
+            return (iid, 0.0, fds, 0.0)
+        elapsed = now - last[0]
+        return (iid, (io_bytes - last[1]) / elapsed, fds, (switches - last[2]) / elapsed)
+
+
+class ProcessTreeIndex:
+    """Parent/child index over the process table, updated incrementally from each snapshot"""
+
+    def __init__(self):
+        self.parent = {}
+        self.children = {}
+
+    def update(self, snapshot):
+        """Relink only the processes that appeared, exited or were reparented"""
+        current = dict(zip(snapshot.pids.tolist(), snapshot.ppids.tolist()))
+        for pid in self.parent.keys() - current.keys():
+            self.unlink(pid)
+        for pid, ppid in current.items():
+            if self.parent.get(pid) != ppid:
+                self.unlink(pid)
+                self.parent[pid] = ppid
+                self.children.setdefault(ppid, set()).add(pid)
+
+    def unlink(self, pid):
+        ppid = self.parent.pop(pid, None)
+        siblings = self.children.get(ppid)
+        if siblings is not None:
+            siblings.discard(pid)
+            if not siblings:
+                del self.children[ppid]
+
+    def subtree(self, pid):
+        """pid followed by all of its descendants, parents before children"""
+        result = [pid]
+        for parent in result:
+            result.extend(sorted(self.children.get(parent, ())))
+        return result
+
+    def roots(self):
+        return sorted(pid for pid, ppid in self.parent.items() if ppid not in self.parent)
+
+    def flatten(self, collapsed=(), visible=None):
+        """(pid, depth) in tree order; skips collapsed subtrees and pids outside `visible`"""
+        rows = []
+        stack = [(pid, 0) for pid in reversed(self.roots())]
+        while stack:
+            pid, depth = stack.pop()
+            if visible is not None and pid not in visible:
+                continue
+            rows.append((pid, depth))
+            if pid not in collapsed:
+                stack.extend((child, depth + 1) for child in sorted(self.children.get(pid, ()), reverse=True))
+        return rows
+
+    def rollup(self, snapshot):
+        """Subtree totals of CPU %, memory % and threads, aligned with the snapshot rows"""
+        pids = snapshot.pids
+        cpu = snapshot.cpu.astype(np.float64)
+        mem = snapshot.mem.astype(np.float64)
+        threads = snapshot.threads.astype(np.int64)
+
+        # Row of each parent, or -1 for roots
+        order = np.argsort(pids)
+        found = np.minimum(np.searchsorted(pids, snapshot.ppids, sorter=order), len(pids) - 1)
+        parent = np.where(pids[order[found]] == snapshot.ppids, order[found], -1)
+
+        # Depth by walking every row up one level per pass; once a pass resolves no row,
+        # the rows still climbing hang off a PPID cycle and are left out, as in flatten()
+        depth = np.zeros(len(pids), dtype=np.int64)
+        up = parent.copy()
+        climbing = np.flatnonzero(up >= 0)
+        while len(climbing):
+            depth[climbing] += 1
+            up[climbing] = parent[up[climbing]]
+            still = climbing[up[climbing] >= 0]
+            if len(still) == len(climbing):
+                parent[still] = -1
+                depth[still] = 0
+                break
+            climbing = still
+
+        # Deepest level first, so each parent has its full subtree before it is added upwards
+        for level in range(int(depth.max(initial=0)), 0, -1):
+            rows = np.flatnonzero((depth == level) & (parent >= 0))
+            np.add.at(cpu, parent[rows], cpu[rows])
+            np.add.at(mem, parent[rows], mem[rows])
+            np.add.at(threads, parent[rows], threads[rows])
+        return cpu, mem, threads
+
+
+class ProcessIndex:
+    """Filtered, sorted row order over the columns of a process snapshot"""
+
+    # Process list heading -> snapshot column
+    SORT_COLUMNS = {'PID': 'pids', 'Name': 'names', 'CPU %': 'cpu', 'Memory %': 'mem', 'Threads': 'threads', 'Status': 'statuses'}
+
+    def __init__(self):
+        self.sort_column = 'PID'
+        self.descending = False
+        self.filter_text = ''
+        self.top_k = None
+        self.snapshot = None
+        # Text columns as numpy arrays, built at most once per snapshot
+        self._arrays = {}
+
+        # Tree mode: hierarchy from the PPID index, with subtree totals per row
+        self.tree = ProcessTreeIndex()
+        self.tree_mode = False
+        self.collapsed = set()
+        self.depths = {}
+        self.totals = None
+
+    def set_snapshot(self, snapshot):
+        self.snapshot = snapshot
+        self._arrays = {}
+        self.tree.update(snapshot)
+        self.totals = None
+
+    def column(self, name):
+        values = getattr(self.snapshot, name)
+        if isinstance(values, tuple):
+            if name not in self._arrays:
+                self._arrays[name] = np.array(values, dtype=str)
+            return self._arrays[name]
+        return values
+
+    def lower_names(self):
+        if 'lower_names' not in self._arrays:
+            self._arrays['lower_names'] = np.char.lower(self.column('names'))
+        return self._arrays['lower_names']
+
+    def name_matches(self, text):
+        """Name substring, or PID prefix when the filter is a number"""
+        matches = np.char.find(self.lower_names(), text) >= 0
+        if text.isdigit():
+            matches |= np.char.startswith(self.snapshot.pids.astype(str), text)
+        return matches
+
+    def tree_order(self):
+        """Rows in parent/child order; a filter keeps matches and their ancestors"""
+        snapshot = self.snapshot
+        row = {pid: i for i, pid in enumerate(snapshot.pids.tolist())}
+        if self.totals is None:
+            self.totals = self.tree.rollup(snapshot)
+
+        visible = None
+        text = self.filter_text.strip().lower()
+        if text:
+            visible = set()
+            for pid in snapshot.pids[self.name_matches(text)].tolist():
+                while pid in self.tree.parent and pid not in visible:
+                    visible.add(pid)
+                    pid = self.tree.parent[pid]
+
+        rows = [(row[pid], depth) for pid, depth in self.tree.flatten(self.collapsed, visible) if pid in row]
+        self.depths = dict(rows)
+        return np.array([i for i, depth in rows], dtype=np.int64)
+
+    def order(self):
+        """Snapshot row indices to display, in display order"""
+        snapshot = self.snapshot
+        if snapshot is None:
+            return np.empty(0, dtype=np.int64)
+        if self.tree_mode:
+            return self.tree_order()
+
+        # Only add processes with some resource usage
+        mask = (snapshot.cpu > 0) | (snapshot.mem > 0)
+
+        # Name substring, or PID prefix when the filter is a number
+        text = self.filter_text.strip().lower()
+        if text:
+            mask &= self.name_matches(text)
+        index = np.flatnonzero(mask)
+
+        # Top-K by CPU in O(n) with argpartition instead of a full sort
+        if self.top_k and len(index) > self.top_k:
+            index = index[np.argpartition(snapshot.cpu[index], -self.top_k)[-self.top_k:]]
+        elif self.sort_column == 'PID' and not self.descending:
+            # Snapshots are already in PID order
+            return index
+
+        keys = self.column(self.SORT_COLUMNS[self.sort_column])[index]
+        order = np.argsort(keys, kind='stable')
+        if self.descending:
+            order = order[::-1]
+        return index[order]
+
+
+# System-wide metrics a rule can watch; process counts come from the process snapshot
+SYSTEM_ALERT_METRICS = ('cpu', 'mem', 'disk', 'net_sent', 'net_recv')
+COUNT_ALERT_METRICS = ('total', 'running', 'sleeping', 'stopped', 'zombie', 'idle', 'unknown')
+# Per-process rules compare a snapshot column for every process
+PROCESS_ALERT_COLUMNS = {'process_cpu': 'cpu', 'process_mem': 'mem', 'process_rss': 'rss', 'process_threads': 'threads'}
+ALERT_OPS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+ALERT_AGGREGATES = ('last', 'avg', 'min', 'max', 'rate')
+
+# Used when no --alert-rules file is given
+DEFAULT_ALERT_RULES = [
+    {'name': 'cpu-high', 'metric': 'cpu', 'op': '>', 'value': 90, 'for': 30},
+    {'name': 'zombies', 'metric': 'zombie', 'op': '>=', 'value': 5, 'for': 60},
+    {'name': 'process-rss', 'metric': 'process_rss', 'op': '>', 'value': 4 * 1024 ** 3}
+]
+
+AlertEvent = namedtuple('AlertEvent', ['rule', 'subject', 'label', 'value', 'firing', 'timestamp'])
+
+
+class SlidingWindow:
+    """Time window over one metric with amortized O(1) append, avg, min, max and rate"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.samples = deque()
+        self.total = 0.0
+        self._min = deque()
+        self._max = deque()
+
+    def append(self, now, value):
+        self.samples.append((now, value))
+        self.total += value
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((now, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((now, value))
+
+        cutoff = now - self.seconds
+        while self.samples[0][0] < cutoff:
+            self.total -= self.samples.popleft()[1]
+        while self._min[0][0] < cutoff:
+            self._min.popleft()
+        while self._max[0][0] < cutoff:
+            self._max.popleft()
+
+    def aggregate(self, kind):
+        if kind == 'avg':
+            return self.total / len(self.samples)
+        if kind == 'min':
+            return self._min[0][1]
+        if kind == 'max':
+            return self._max[0][1]
+        # Rate of change per second between the oldest and newest sample
+        (start, first), (end, last) = self.samples[0], self.samples[-1]
+        return (last - first) / (end - start) if end > start else 0.0
+
+
+class AlertRule:
+    """One condition: `aggregate(metric) op value`, held for `duration` seconds"""
+
+    def __init__(self, name, metric, op, value, duration=0.0, aggregate='last', window=None, process=None):
+        self.name = name
+        self.metric = metric
+        self.op = op
+        self.compare = ALERT_OPS[op]
+        self.value = value
+        self.duration = duration
+        self.aggregate = aggregate
+        self.window = window
+        # Name substring that limits a per-process rule
+        self.process = process.lower() if process else None
+
+    @classmethod
+    def from_dict(cls, spec):
+        """Build a rule from its JSON form; raises ValueError on a bad rule"""
+        if not isinstance(spec, dict):
+            raise ValueError(f"rule {spec!r} is not a JSON object")
+        try:
+            name, metric, op, value = spec['name'], spec['metric'], spec['op'], float(spec['value'])
+        except KeyError as e:
+            raise ValueError(f"rule {spec.get('name', spec)!r} is missing {e}") from None
+        except (TypeError, ValueError):
+            raise ValueError(f"rule {spec['name']!r} has a non-numeric value") from None
+        if metric not in SYSTEM_ALERT_METRICS + COUNT_ALERT_METRICS and metric not in PROCESS_ALERT_COLUMNS:
+            raise ValueError(f"rule {name!r}: unknown metric {metric!r}")
+        if op not in ALERT_OPS:
+            raise ValueError(f"rule {name!r}: op must be one of {', '.join(ALERT_OPS)}")
+        aggregate = spec.get('aggregate', 'last')
+        if aggregate not in ALERT_AGGREGATES:
+            raise ValueError(f"rule {name!r}: aggregate must be one of {', '.join(ALERT_AGGREGATES)}")
+        seconds = {}
+        for key in ('for', 'window'):
+            try:
+                seconds[key] = float(spec[key]) if spec.get(key) else None
+            except (TypeError, ValueError):
+                raise ValueError(f"rule {name!r} has a non-numeric {key!r}") from None
+        window = seconds['window']
+        if aggregate != 'last' and not window:
+            raise ValueError(f"rule {name!r}: aggregate {aggregate!r} needs a window in seconds")
+        if aggregate != 'last' and metric in PROCESS_ALERT_COLUMNS:
+            raise ValueError(f"rule {name!r}: per-process rules only support the latest value")
+        return cls(name, metric, op, value, seconds['for'] or 0.0, aggregate, window, spec.get('process'))
+
+    def describe(self):
+        subject = self.metric if self.aggregate == 'last' else f"{self.aggregate}({self.metric}, {self.window:g} s)"
+        held = f" for {self.duration:g} s" if self.duration else ""
+        # RSS limits read in MB, like the current value in format_alert
+        value = f"{self.value / 1024 ** 2:g} MB" if self.metric == 'process_rss' else f"{self.value:g}"
+        return f"{subject} {self.op} {value}{held}"
+
+
+def load_alert_rules(path=None):
+    """Rules from a JSON list in `path`, or the defaults"""
+    specs = DEFAULT_ALERT_RULES
+    if path:
+        with open(path) as f:
+            specs = json.load(f)
+        if not isinstance(specs, list):
+            raise ValueError("the rules file must hold a JSON list of rules")
+    rules = [AlertRule.from_dict(spec) for spec in specs]
+    names = [rule.name for rule in rules]
+    if len(set(names)) != len(names):
+        raise ValueError("rule names must be unique")
+    return rules
+
+
+class AlertEngine:
+    """Evaluates rules as samples arrive and returns the alerts that started or stopped firing"""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.by_metric = {}
+        self.windows = {}
+        self.metric_windows = {}
+        self.process_rules = []
+        for rule in rules:
+            if rule.metric in PROCESS_ALERT_COLUMNS:
+                self.process_rules.append(rule)
+                continue
+            self.by_metric.setdefault(rule.metric, []).append(rule)
+            if rule.aggregate != 'last' and (rule.metric, rule.window) not in self.windows:
+                window = self.windows[(rule.metric, rule.window)] = SlidingWindow(rule.window)
+                self.metric_windows.setdefault(rule.metric, []).append(window)
+        # rule name -> {subject: monotonic time the condition started holding}
+        self.pending = {rule.name: {} for rule in rules}
+        # rule name -> {subject: AlertEvent}
+        self.firing = {rule.name: {} for rule in rules}
+
+    @property
+    def needs_processes(self):
+        """Whether any rule reads the process snapshot, so its collector must keep running"""
+        return bool(self.process_rules) or any(metric in self.by_metric for metric in COUNT_ALERT_METRICS)
+
+    def active(self):
+        return [event for events in self.firing.values() for event in events.values()]
+
+    def check(self, rule, subject, label, value, now, events):
+        pending, firing = self.pending[rule.name], self.firing[rule.name]
+        if rule.compare(value, rule.value):
+            since = pending.setdefault(subject, now)
+            if subject in firing:
+                firing[subject] = firing[subject]._replace(value=value)
+            elif now - since >= rule.duration:
+                firing[subject] = AlertEvent(rule, subject, label, value, True, time.time())
+                events.append(firing[subject])
+        else:
+            self.resolve(rule, subject, value, events)
+
+    def resolve(self, rule, subject, value, events):
+        self.pending[rule.name].pop(subject, None)
+        event = self.firing[rule.name].pop(subject, None)
+        if event is not None:
+            events.append(event._replace(value=value, firing=False, timestamp=time.time()))
+
+    def update(self, metrics, now=None):
+        """Feed {metric: value}; return the alerts that started or stopped firing"""
+        now = time.monotonic() if now is None else now
+        events = []
+        for metric, value in metrics.items():
+            rules = self.by_metric.get(metric)
+            if not rules:
+                continue
+            for window in self.metric_windows.get(metric, ()):
+                window.append(now, value)
+            for rule in rules:
+                current = value if rule.aggregate == 'last' else self.windows[(metric, rule.window)].aggregate(rule.aggregate)
+                self.check(rule, None, metric, current, now, events)
+        return events
+
+    def update_processes(self, snapshot, now=None):
+        """Feed a process snapshot: its status counts plus every per-process rule"""
+        now = time.monotonic() if now is None else now
+        events = self.update(snapshot.counts, now)
+        lower_names = rows = None
+        for rule in self.process_rules:
+            column = getattr(snapshot, PROCESS_ALERT_COLUMNS[rule.metric])
+            mask = rule.compare(column, rule.value)
+            if rule.process:
+                if lower_names is None:
+                    lower_names = np.char.lower(np.array(snapshot.names, dtype=str))
+                mask &= np.char.find(lower_names, rule.process) >= 0
+            offenders = set()
+            for i in np.flatnonzero(mask).tolist():
+                iid = snapshot.iids[i]
+                offenders.add(iid)
+                self.check(rule, iid, f"{snapshot.names[i]} (PID {snapshot.pids[i]})", float(column[i]), now, events)
+            # Processes that dropped back under the limit (resolved with their current value), or exited (None)
+            gone = [iid for iid in self.pending[rule.name] if iid not in offenders]
+            if gone and rows is None:
+                rows = {iid: i for i, iid in enumerate(snapshot.iids)}
+            for iid in gone:
+                i = rows.get(iid)
+                self.resolve(rule, iid, float(column[i]) if i is not None else None, events)
+        return events
+
+
+def format_alert(event):
+    if event.value is None:
+        now = "exited"
+    elif event.rule.metric == 'process_rss':
+        now = f"now {event.value / 1024 ** 2:.1f} MB"
+    else:
+        now = f"now {event.value:.2f}"
+    subject = f" {event.label}" if event.subject is not None else ""
+    return f"[{event.rule.name}]{subject}: {event.rule.describe()} ({now})"
+
+
+def system_alert_metrics(system):
+    return {
+        'cpu': system['cpu'],
+        'mem': system['mem'],
+        'disk': system['disk'],
+        'net_sent': sum(sent for sent, recv in system['net'].values()),
+        'net_recv': sum(recv for sent, recv in system['net'].values())
+    }
+
+
+class AlertNotifier:
+    """Writes alert transitions to a log and runs an optional command (with ALERT_* variables) for each one"""
+
+    def __init__(self, log_path=None, command=None):
+        import shlex
+        self.log = open(log_path, 'a') if log_path else sys.stderr
+        self.command = shlex.split(command) if command else None
+        self._children = []
+
+    def notify(self, events):
+        import subprocess
+        self._children = [child for child in self._children if child.poll() is None]
+        for event in events:
+            state = 'firing' if event.firing else 'resolved'
+            stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(event.timestamp))
+            message = format_alert(event)
+            print(f"{stamp} alert {state}: {message}", file=self.log, flush=True)
+            if self.command is None:
+                continue
+            env = dict(
+                os.environ, ALERT_RULE=event.rule.name, ALERT_STATE=state, ALERT_SUBJECT=event.label,
+                ALERT_VALUE='' if event.value is None else str(event.value), ALERT_MESSAGE=message
+            )
+            try:
+                self._children.append(subprocess.Popen(self.command, env=env, stdin=subprocess.DEVNULL))
+            except OSError as e:
+                print(f"Alert command failed: {e}", file=sys.stderr)
+
+    def close(self):
+        if self.log is not sys.stderr:
+            self.log.close()
+
+
+# Seconds a process tree gets to exit after SIGTERM before it is sent SIGKILL
+TREE_KILL_TIMEOUT = 3.0
+
+
+def terminate_tree(root, iids, same_process, timeout=TREE_KILL_TIMEOUT):
+    """SIGTERM every sampled process in one pass, then SIGKILL whatever is still alive after `timeout`"""
+    procs, reused, failed = [], [], []
+    for iid in iids:
+        # The snapshot may be seconds old: skip PIDs that now belong to another process
+        pid = int(iid.split(':')[0])
+        try:
+            proc = psutil.Process(pid)
+            if same_process(iid, proc):
+                procs.append(proc)
+            else:
+                reused.append(pid)
+        except (psutil.NoSuchProcess, FileNotFoundError):
+            pass
+        except (psutil.AccessDenied, OSError):
+            failed.append(pid)
+
+    signalled = []
+    for proc in procs:
+        try:
+            proc.terminate()
+            signalled.append(proc)
+        except psutil.NoSuchProcess:
+            pass
+        except psutil.AccessDenied:
+            failed.append(proc.pid)
+
+    gone, alive = psutil.wait_procs(signalled, timeout=timeout)
+    killed = []
+    for proc in alive:
+        try:
+            proc.kill()
+            killed.append(proc.pid)
+        except psutil.NoSuchProcess:
+            pass
+        except psutil.AccessDenied:
+            failed.append(proc.pid)
+
+    return {'pid': root, 'terminated': len(gone), 'killed': killed, 'failed': failed, 'reused': reused}
+
+
+def draw_sparkline(canvas, line, data):
+    """Fit a series into a canvas by moving the coords of one existing line item"""
+    valid = data[~np.isnan(data)]
+    if len(valid) < 2:
+        canvas.coords(line, 0, 0, 0, 0)
+        return
+    width = int(canvas['width'])
+    height = int(canvas['height'])
+    low, high = float(valid.min()), float(valid.max())
+    scale = (height - 4) / (high - low) if high > low else 0.0
+    xs = np.linspace(0, width, len(valid))
+    ys = height - 2 - (valid - low) * scale
+    canvas.coords(line, *np.column_stack((xs, ys)).ravel().tolist())
+
+
+def top_processes(snapshot, count):
+    """(pid, cpu %, memory %, name) of the busiest processes in a snapshot"""
+    if snapshot is None or not len(snapshot.cpu):
+        return []
+    count = min(count, len(snapshot.cpu))
+    top = np.argpartition(snapshot.cpu, -count)[-count:]
+    top = top[np.argsort(snapshot.cpu[top])[::-1]]
+    return [(int(snapshot.pids[i]), float(snapshot.cpu[i]), float(snapshot.mem[i]), snapshot.names[i]) for i in top]
+
+
+def freeze(array):
+    """Mark a numpy array read-only so a snapshot can be shared across threads"""
+    array.flags.writeable = False
+    return array
+
+
+class ProcessBackend:
+    """Reads the process table; subclasses fill in the columns for one tick"""
+
+    def sample(self):
+        """Return a ProcessSnapshot of every process"""
+        start = time.perf_counter()
+
+        # Initialize process counts
+        self.process_counts = {
+            'total': 0,
+            'running': 0,
+            'sleeping': 0,
+            'stopped': 0,
+            'zombie': 0,
+            'idle': 0,
+            'unknown': 0
+        }
+        self.columns = ([], [], [], [], [], [], [], [], [])
+        self.read_processes()
+        iids, pids, ppids, names, cpu, mem, rss, threads, statuses = self.columns
+
+        return ProcessSnapshot(
+            timestamp=time.time(),
+            iids=tuple(iids),
+            pids=freeze(np.array(pids, dtype=np.int64)),
+            ppids=freeze(np.array(ppids, dtype=np.int64)),
+            names=tuple(names),
+            cpu=freeze(np.array(cpu, dtype=np.float32)),
+            mem=freeze(np.array(mem, dtype=np.float32)),
+            rss=freeze(np.array(rss, dtype=np.int64)),
+            threads=freeze(np.array(threads, dtype=np.int32)),
+            statuses=tuple(statuses),
+            counts=self.process_counts,
+            collect_ms=(time.perf_counter() - start) * 1000
+        )
+
+    def add_process(self, iid, pid, ppid, name, cpu_percent, mem_percent, rss, threads, status):
+        # Increment the count for the specific process status
+        if status in self.process_counts:
+            self.process_counts[status] += 1
+        else:
+            self.process_counts['unknown'] += 1
+
+        for column, value in zip(self.columns, (iid, pid, ppid, name, cpu_percent, mem_percent, rss, threads, status)):
+            column.append(value)
+
+    def read_processes(self):
+        raise NotImplementedError
+
+    def same_process(self, iid, proc):
+        """Whether proc is still the process sampled as iid, not a later one reusing its PID"""
+        raise NotImplementedError
+
+
+class PsutilProcessBackend(ProcessBackend):
+    """Portable backend built on psutil"""
+
+    def __init__(self):
+        self._procs = {}
+        # pid -> parent pid, read once per process rather than on every tick
+        self._ppids = {}
+        # Total memory read once, so mem % comes from the rss already in the oneshot() pass
+        self.mem_total = psutil.virtual_memory().total
+
+    def read_processes(self):
+        # Process objects are kept between ticks so cpu_percent() has a baseline
+        procs, ppids = {}, {}
+        now = time.time()
+        pids = sorted(psutil.pids())
+        alive = set(pids)
+        for pid in pids:
+            self.process_counts['total'] += 1
+            proc = self._procs.get(pid)
+            is_new = proc is None
+            try:
+                if is_new:
+                    proc = psutil.Process(pid)
+                # as_dict() reads every column inside a single oneshot() pass
+                info = proc.as_dict(attrs=PROCESS_ATTRS)
+                ppid = self._ppids.get(pid)
+                # A process only changes parent when it is reparented after its parent exits
+                if ppid is None or (ppid and ppid not in alive):
+                    ppid = proc.ppid()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            procs[pid] = proc
+            ppids[pid] = ppid
+
+            # Get CPU, memory usage, threads, and status
+            cpu_percent = info['cpu_percent'] or 0.0
+            if is_new and info['cpu_times'] and info['create_time']:
+                # First cpu_percent() call has nothing to compare against; use the lifetime average
+                lifetime = max(now - info['create_time'], 0.001)
+                cpu_percent = (info['cpu_times'].user + info['cpu_times'].system) / lifetime * 100
+
+            rss = info['memory_info'].rss if info['memory_info'] else 0
+
+            # PID + create time so a reused PID gets a fresh row
+            self.add_process(
+                f"{pid}:{info['create_time']}",
+                pid,
+                ppid or 0,
+                info['name'],
+                cpu_percent,
+                rss / self.mem_total * 100,
+                rss,
+                info['num_threads'] or 0,
+                info['status']
+            )
+        self._procs = procs
+        self._ppids = ppids
+
+    def same_process(self, iid, proc):
+        return iid == f"{proc.pid}:{proc.create_time()}"
+
+
+class ProcfsProcessBackend(ProcessBackend):
+    """Linux fast path that parses /proc/[pid]/stat directly, without psutil objects"""
+
+    def __init__(self, proc_root='/proc'):
+        self.proc_root = proc_root
+        self.clock_ticks = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.mem_total = self.read_mem_total()
+        # One buffer reused for every read; a stat line is well under 4 KiB
+        self._buf = bytearray(4096)
+        # iid -> (utime + stime ticks, monotonic time) from the previous tick
+        self._cpu_ticks = {}
+        # iid -> full name, for comm values the kernel cut at 15 characters
+        self._long_names = {}
+
+    def read_mem_total(self):
+        with open(os.path.join(self.proc_root, 'meminfo')) as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) * 1024
+        return psutil.virtual_memory().total
+
+    def read_file(self, path):
+        """Read a small /proc file into the shared buffer; return its length"""
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            return os.readv(fd, [self._buf])
+        finally:
+            os.close(fd)
+
+    def read_uptime(self):
+        size = self.read_file(os.path.join(self.proc_root, 'uptime'))
+        return float(self._buf[:size].split()[0])
+
+    def full_name(self, iid, pid, comm):
+        """Expand a truncated comm from cmdline the same way psutil.Process.name() does"""
+        name = self._long_names.get(iid)
+        if name is None:
+            name = comm
+            try:
+                with open(os.path.join(self.proc_root, str(pid), 'cmdline'), 'rb') as f:
+                    argv0 = f.read().split(b'\0', 1)[0].decode(errors='replace')
+            except OSError:
+                argv0 = ''
+            if argv0 and os.path.basename(argv0).startswith(comm):
+                name = os.path.basename(argv0)
+            self._long_names[iid] = name
+        return name
+
+    def read_processes(self):
+        buf = self._buf
+        now = time.monotonic()
+        uptime = self.read_uptime()
+        cpu_ticks = {}
+        pids = sorted(int(entry) for entry in os.listdir(self.proc_root) if entry.isdigit())
+
+        for pid in pids:
+            self.process_counts['total'] += 1
+            try:
+                size = self.read_file(f"{self.proc_root}/{pid}/stat")
+            except OSError:
+                # Process exited between listdir() and open()
+                continue
+
+            # comm may itself contain ')' so split on the last one
+            close = buf.rfind(b')', 0, size)
+            comm = buf[buf.find(b'(') + 1:close].decode(errors='replace')
+            fields = buf[close + 2:size].split()
+            status = PROC_STATES.get(fields[0].decode(), 'unknown')
+            ppid = int(fields[1])
+            ticks = int(fields[11]) + int(fields[12])
+            threads = int(fields[17])
+            start_ticks = int(fields[19])
+            rss = int(fields[21])
+
+            iid = f"{pid}:{start_ticks}"
+            previous = self._cpu_ticks.get(iid)
+            if previous is None:
+                # First sighting: lifetime average, like the psutil backend
+                lifetime = max(uptime - start_ticks / self.clock_ticks, 0.001)
+                cpu_percent = ticks / self.clock_ticks / lifetime * 100
+            else:
+                elapsed = max(now - previous[1], 0.001)
+                cpu_percent = (ticks - previous[0]) / self.clock_ticks / elapsed * 100
+            cpu_ticks[iid] = (ticks, now)
+
+            if len(comm) == 15:
+                comm = self.full_name(iid, pid, comm)
+
+            self.add_process(
+                iid,
+                pid,
+                ppid,
+                comm,
+                cpu_percent,
+                rss * self.page_size / self.mem_total * 100,
+                rss * self.page_size,
+                threads,
+                status
+            )
+
+        self._cpu_ticks = cpu_ticks
+        self._long_names = {iid: name for iid, name in self._long_names.items() if iid in cpu_ticks}
+
+    def same_process(self, iid, proc):
+        # Called off the collector thread, so it cannot use the shared buffer
+        with open(f"{self.proc_root}/{proc.pid}/stat", 'rb') as f:
+            stat = f.read()
+        start_ticks = int(stat[stat.rfind(b')') + 2:].split()[19])
+        return iid == f"{proc.pid}:{start_ticks}"
+
+
+def make_process_backend():
+    """Pick the /proc fast path on Linux and fall back to psutil elsewhere"""
+    if sys.platform.startswith('linux') and os.access('/proc/self/stat', os.R_OK):
+        return ProcfsProcessBackend()
+    return PsutilProcessBackend()
+
+
+class ProcessCollector:
+    """Process table collector for the sampling scheduler"""
+
+    name = 'processes'
+
+    def __init__(self, interval=2.0, backend=None):
+        self.interval = FixedInterval(interval)
+        self.backend = backend or make_process_backend()
+
+    def sample(self):
+        """Read every process once and build a snapshot"""
+        return self.backend.sample()
+
+
+# Limits for one phase of the HTTP speed test; a phase ends at whichever comes first
+SPEEDTEST_DOWNLOAD_BYTES = 25 * 1000 * 1000
+SPEEDTEST_UPLOAD_BYTES = 10 * 1000 * 1000
+SPEEDTEST_PHASE_SECONDS = 10.0
+SPEEDTEST_CHUNK = 64 * 1024
+# Minimum seconds between progress updates sent to the UI
+SPEEDTEST_PROGRESS_INTERVAL = 0.2
+
+
+class SpeedTestCancelled(Exception):
+    pass
+
+
+class HttpSpeedTest:
+    """Ping, download and upload in fixed-size chunks against an HTTP target laid out like SpeedTestServer"""
+
+    def __init__(self, base_url, cancel, progress, download_bytes=SPEEDTEST_DOWNLOAD_BYTES,
+                 upload_bytes=SPEEDTEST_UPLOAD_BYTES, phase_seconds=SPEEDTEST_PHASE_SECONDS, timeout=10):
+        import urllib.parse
+        url = urllib.parse.urlsplit(base_url)
+        if url.scheme not in ('http', 'https') or not url.netloc:
+            raise ValueError(f"not an http(s) URL: {base_url}")
+        self.url = url
+        self.prefix = url.path.rstrip('/')
+        self.cancel = cancel
+        self.progress = progress
+        self.download_bytes = download_bytes
+        self.upload_bytes = upload_bytes
+        self.phase_seconds = phase_seconds
+        self.timeout = timeout
+        self._last_report = 0.0
+
+    def connection(self):
+        import http.client
+        connection_class = http.client.HTTPSConnection if self.url.scheme == 'https' else http.client.HTTPConnection
+        return connection_class(self.url.netloc, timeout=self.timeout)
+
+    def check_cancel(self):
+        if self.cancel.is_set():
+            raise SpeedTestCancelled()
+
+    def report(self, phase, done, total, start, final=False):
+        """Send progress, at most every SPEEDTEST_PROGRESS_INTERVAL seconds"""
+        now = time.perf_counter()
+        if not final and now - self._last_report < SPEEDTEST_PROGRESS_INTERVAL:
+            return
+        self._last_report = now
+        elapsed = now - start
+        self.progress({
+            'phase': phase,
+            'fraction': min(max(done / total, elapsed / self.phase_seconds), 1.0),
+            'mbps': done * 8 / elapsed / 1_000_000 if elapsed > 0 else 0.0
+        })
+
+    def ping(self, count=3):
+        """Median round trip of a tiny request, in milliseconds"""
+        conn = self.connection()
+        times = []
+        try:
+            for _ in range(count):
+                self.check_cancel()
+                start = time.perf_counter()
+                conn.request('GET', self.prefix + '/ping')
+                conn.getresponse().read()
+                times.append((time.perf_counter() - start) * 1000)
+        finally:
+            conn.close()
+        return sorted(times)[len(times) // 2]
+
+    def download(self):
+        conn = self.connection()
+        try:
+            conn.request('GET', f"{self.prefix}/download?bytes={self.download_bytes}")
+            response = conn.getresponse()
+            if response.status != 200:
+                raise OSError(f"download failed: HTTP {response.status}")
+            buf = bytearray(SPEEDTEST_CHUNK)
+            received = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < self.phase_seconds:
+                self.check_cancel()
+                size = response.readinto(buf)
+                if not size:
+                    break
+                received += size
+                self.report('download', received, self.download_bytes, start)
+            elapsed = time.perf_counter() - start
+        finally:
+            conn.close()
+        self.report('download', received, self.download_bytes, start, final=True)
+        return received * 8 / elapsed / 1_000_000
+
+    def upload(self):
+        conn = self.connection()
+        try:
+            conn.putrequest('POST', self.prefix + '/upload')
+            conn.putheader('Content-Type', 'application/octet-stream')
+            conn.putheader('Content-Length', str(self.upload_bytes))
+            conn.endheaders()
+            block = bytes(SPEEDTEST_CHUNK)
+            sent = 0
+            start = time.perf_counter()
+            while sent < self.upload_bytes and time.perf_counter() - start < self.phase_seconds:
+                self.check_cancel()
+                conn.send(block[:min(SPEEDTEST_CHUNK, self.upload_bytes - sent)])
+                sent += min(SPEEDTEST_CHUNK, self.upload_bytes - sent)
+                self.report('upload', sent, self.upload_bytes, start)
+            if sent == self.upload_bytes:
+                # Wait for the server to have read it all, not just for the socket buffer to take it
+                conn.getresponse().read()
+            elapsed = time.perf_counter() - start
+        finally:
+            # A phase cut short by the time limit just drops the connection
+            conn.close()
+        self.report('upload', sent, self.upload_bytes, start, final=True)
+        return sent * 8 / elapsed / 1_000_000
+
+    def run(self):
+        ping = self.ping()
+        download = self.download()
+        upload = self.upload()
+        return {'download': download, 'upload': upload, 'ping': ping, 'server': self.url.netloc}
+
+
+class SpeedtestNetTest:
+    """The speedtest.net test through speedtest-cli, with its shutdown event as the cancel flag"""
+
+    def __init__(self, cancel, progress):
+        self.cancel = cancel
+        self.progress = progress
+
+    def callback(self, phase):
+        finished = {'count': 0, 'reported': 0.0}
+
+        def on_request(i, count, start=False, end=False):
+            # speedtest-cli calls this from its own threads; only finished requests count
+            if not end:
+                return
+            finished['count'] += 1
+            now = time.perf_counter()
+            if finished['count'] == count or now - finished['reported'] >= SPEEDTEST_PROGRESS_INTERVAL:
+                finished['reported'] = now
+                self.progress({'phase': phase, 'fraction': finished['count'] / count, 'mbps': None})
+        return on_request
+
+    def run(self):
+        # Only loaded when a test is actually run
+        import speedtest
+        st = speedtest.Speedtest(shutdown_event=self.cancel)
+        st.get_best_server()
+        if self.cancel.is_set():
+            raise SpeedTestCancelled()
+        download = st.download(callback=self.callback('download'))
+        if self.cancel.is_set():
+            raise SpeedTestCancelled()
+        upload = st.upload(callback=self.callback('upload'), pre_allocate=False)
+        if self.cancel.is_set():
+            raise SpeedTestCancelled()
+        return {
+            'download': download / 1_000_000,
+            'upload': upload / 1_000_000,
+            'ping': st.results.ping,
+            'server': st.results.server.get('sponsor', '')
+        }
+
+
+class SpeedTestServer:
+    """Offline stand-in target serving /ping, /download?bytes=N and /upload, optionally throttled to `rate` bytes/s"""
+
+    # Largest download one request may ask for
+    MAX_DOWNLOAD = 1024 ** 3
+
+    def __init__(self, host='127.0.0.1', port=0, rate=None):
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.httpd = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def throttle(self, moved, start):
+        if self.rate:
+            ahead = moved / self.rate - (time.perf_counter() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    def start(self):
+        import urllib.parse
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        server = self
+        block = bytes(SPEEDTEST_CHUNK)
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def reply(self, status, body=b''):
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urllib.parse.urlsplit(self.path)
+                if url.path.endswith('/ping'):
+                    self.reply(200)
+                    return
+                if not url.path.endswith('/download'):
+                    self.reply(404)
+                    return
+                try:
+                    size = min(int(urllib.parse.parse_qs(url.query).get('bytes', ['0'])[0]), server.MAX_DOWNLOAD)
+                except ValueError:
+                    self.reply(400)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/octet-stream')
+                self.send_header('Content-Length', str(size))
+                self.end_headers()
+                sent = 0
+                start = time.perf_counter()
+                try:
+                    while sent < size:
+                        chunk = min(SPEEDTEST_CHUNK, size - sent)
+                        self.wfile.write(block[:chunk])
+                        sent += chunk
+                        server.throttle(sent, start)
+                except OSError:
+                    # Client cancelled or hit its time limit
+                    self.close_connection = True
+
+            def do_POST(self):
+                if not urllib.parse.urlsplit(self.path).path.endswith('/upload'):
+                    self.reply(404)
+                    return
+                length = int(self.headers.get('Content-Length', 0))
+                received = 0
+                start = time.perf_counter()
+                try:
+                    while received < length:
+                        data = self.rfile.read(min(SPEEDTEST_CHUNK, length - received))
+                        if not data:
+                            break
+                        received += len(data)
+                        server.throttle(received, start)
+                    self.reply(200, json.dumps({'received': received}).encode())
+                except OSError:
+                    self.close_connection = True
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+
+class SpeedTestRunner:
+    """Runs at most one speed test at a time, posting ('speedtest', event) progress to the results queue"""
+
+    def __init__(self, results, target='speedtest.net'):
+        self.results = results
+        self.target = target
+        self.server = None
+        self._cancel = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start a test; returns False if one is already running"""
+        if self.running:
+            return False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._cancel,), daemon=True)
+        self._thread.start()
+        return True
+
+    def cancel(self):
+        self._cancel.set()
+
+    def report(self, event):
+        self.results.put(('speedtest', event))
+
+    def make_test(self, cancel):
+        if self.target == 'speedtest.net':
+            return SpeedtestNetTest(cancel, self.report)
+        base_url = self.target
+        if self.target == 'local':
+            if self.server is None:
+                self.server = SpeedTestServer()
+                self.server.start()
+            base_url = self.server.url
+        return HttpSpeedTest(base_url, cancel, self.report)
+
+    def _run(self, cancel):
+        self.report({'phase': 'starting', 'target': self.target})
+        try:
+            result = self.make_test(cancel).run()
+        except SpeedTestCancelled:
+            self.report({'phase': 'cancelled'})
+        except Exception as e:
+            # Whatever the worker hits has to reach the UI rather than end the thread silently
+            self.report({'phase': 'cancelled'} if cancel.is_set() else {'phase': 'error', 'message': str(e)})
+        else:
+            result['phase'] = 'done'
+            self.report(result)
+
+    def stop(self, timeout=2.0):
+        """Cancel any running test, wait for it briefly and shut the stand-in server down"""
+        self.cancel()
+        if self.running:
+            self._thread.join(timeout)
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
+
 
 class ModernUbuntuTaskManager:
-    def __init__(self, master):
+    def __init__(self, master, history_length=50, metrics_dir=None, exporter=None, alert_engine=None, alert_notifier=None,
+                 speedtest_target='speedtest.net'):
         self.master = master
         master.title("Ubuntu Task Manager Pro ")
         master.geometry("1200x800")
@@ -65,12 +2012,24 @@ class ModernUbuntuTaskManager:
         )
         self.subtitle_label.pack(pady=(2, 0))
 
+        # Firing alerts; only packed while there is at least one
+        self.alert_banner = tk.Label(
+            master,
+            text="",
+            font=("Helvetica", 11, "bold"),
+            bg="#c0392b",
+            fg="#ecf0f1",
+            justify='left',
+            anchor='w'
+        )
+
         # Custom style
         self.style = ttk.Style()
         self.style.theme_use('clam')
         self.style.configure('TNotebook', background='#34495e')
         self.style.configure('TNotebook.Tab', background='#2c3e50', foreground='white', padding=[10, 5])
         self.style.map('TNotebook.Tab', background=[('selected', '#3498db')])
+        self.style.configure('Treeview', rowheight=PROCESS_ROW_HEIGHT)
 
         # Initializing notebook
         self.notebook = ttk.Notebook(master)
@@ -81,6 +2040,7 @@ class ModernUbuntuTaskManager:
         self.system_frame = ttk.Frame(self.notebook)
         self.performance_frame = ttk.Frame(self.notebook)
         self.network_frame = ttk.Frame(self.notebook)
+        self.diagnostics_frame = ttk.Frame(self.notebook)
         
 
         # Adding tabs
@@ -88,41 +2048,140 @@ class ModernUbuntuTaskManager:
         self.notebook.add(self.system_frame, text='System Resources')
         self.notebook.add(self.performance_frame, text='Performance Charts')
         self.notebook.add(self.network_frame, text='Network Insights')
+        self.notebook.add(self.diagnostics_frame, text='Diagnostics')
         
 
         # Performance tracking
-        self.cpu_history = [0] * 50
-        self.mem_history = [0] * 50
-        self.disk_history = [0] * 50
-        self.network_history = {'sent': [0] * 50, 'recv': [0] * 50}
+        self.history_length = history_length
+        self.cpu_history = RingBuffer(history_length)
+        self.mem_history = RingBuffer(history_length)
+        self.disk_history = RingBuffer(history_length)
+        # Network throughput in MB/s, in total and per interface
+        self.network_history = {'sent': RingBuffer(history_length), 'recv': RingBuffer(history_length)}
+        self.nic_history = {}
+        self.nic_lines = {}
+
+        # On-disk history for replay; the app still runs if it cannot be opened
+        self.metrics_store = None
+        if metrics_dir:
+            try:
+                self.metrics_store = MetricsStore(metrics_dir)
+            except OSError as e:
+                print(f"Metrics history disabled: {e}", file=sys.stderr)
+
+        # Optional HTTP endpoint fed from the same samples as the charts
+        self.exporter = exporter
+
+        # Alert rules run on every system sample and process snapshot
+        self.alert_engine = alert_engine
+        self.alert_notifier = alert_notifier
+
+        # Rows currently shown in the process tree, keyed by iid (PID + create time)
+        self.process_rows = {}
+
+        # Virtual scrolling: the tree only holds the rows in view, the snapshot holds the rest
+        self.process_index = ProcessIndex()
+        self.process_snapshot = None
+        # Set when snapshots arrived while the process tab was hidden
+        self.process_list_stale = False
+        self.process_order = np.empty(0, dtype=np.int64)
+        self.process_offset = 0
+        self.visible_process_rows = 30
+        self.selected_process_iid = None
+
+        # Per-process sparkline history for the detail pane
+        self.process_history = ProcessHistoryStore(capacity=256, length=120)
+
+        # Stage timings and on-demand profiling for the Diagnostics tab
+        self.instrumentation = Instrumentation()
+        self.own_process = psutil.Process()
+        self.own_process.cpu_percent()
 
         # Tabs setup
         self.setup_processes_tab()
         self.setup_system_tab()
         self.setup_performance_tab()
         self.setup_network_tab()
+        self.setup_diagnostics_tab()
+
+        # Charts on hidden tabs are not redrawn and their collectors pause; catch up when one is shown
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
        
-        # Periodic updates
-        self.start_periodic_updates()
+        # Periodic updates: every collector runs on the scheduler thread
+        self.scheduler = SamplingScheduler(self.instrumentation)
+        self.process_collector = ProcessCollector(interval=2.0)
+        self.detail_collector = ProcessDetailCollector(interval=1.0)
+        for collector in (
+            self.process_collector,
+            self.detail_collector,
+            CpuCollector(interval=0.25),
+            SystemCollector(interval=1.0, disk_interval=5.0),
+            PerCoreCpuCollector(),
+            DiskIOCollector(),
+            MemoryCollector(),
+            PartitionCollector()
+        ):
+            self.scheduler.add(collector)
+        self.update_paused_collectors()
+        self.scheduler.start()
+
+        # Speed tests run on their own worker and report through the same queue
+        self.speedtest = SpeedTestRunner(self.scheduler.results, speedtest_target)
+        self.poll_collector_results()
+        self.update_diagnostics()
+
+        # Stop the sampler and flush history before the window goes away
+        master.protocol('WM_DELETE_WINDOW', self.on_close)
 
     def setup_processes_tab(self):
+        # Filter box and top-K toggle
+        filter_frame = ttk.Frame(self.processes_frame)
+        filter_frame.pack(side='top', fill='x', padx=10, pady=5)
+
+        ttk.Label(filter_frame, text="Filter (name or PID):").pack(side='left')
+        self.process_filter_var = tk.StringVar()
+        self.process_filter_var.trace_add('write', lambda *args: self.refresh_process_order())
+        ttk.Entry(filter_frame, textvariable=self.process_filter_var, width=30).pack(side='left', padx=5)
+
+        self.top_k_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            filter_frame, text=f"Top {PROCESS_TOP_K} by CPU", variable=self.top_k_var, command=self.toggle_top_k
+        ).pack(side='left', padx=10)
+
+        self.tree_mode_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            filter_frame, text="Tree view (totals per subtree)", variable=self.tree_mode_var, command=self.toggle_tree_mode
+        ).pack(side='left', padx=10)
         
         # Treeview for processes
         columns = ('PID', 'Name', 'CPU %', 'Memory %', 'Threads', 'Status')
         self.process_tree = ttk.Treeview(self.processes_frame, columns=columns, show='headings', selectmode='browse')
         
-        # columns config
+        # columns config, clicking a heading sorts by it
         for col in columns:
-            self.process_tree.heading(col, text=col)
+            self.process_tree.heading(col, text=col, command=lambda col=col: self.sort_processes(col))
             self.process_tree.column(col, width=100, anchor='center')
+        self.update_sort_headings()
         
-        # scrollbar
-        scrollbar = ttk.Scrollbar(self.processes_frame, orient='vertical', command=self.process_tree.yview)
-        self.process_tree.configure(yscroll=scrollbar.set)
+        # scrollbar drives the window offset, not the treeview itself
+        self.process_scrollbar = ttk.Scrollbar(self.processes_frame, orient='vertical', command=self.scroll_processes)
+
+        # detail pane for the selected process, right of the scrollbar
+        self.setup_process_detail_pane()
 
         # treeview and scrollbar
         self.process_tree.pack(side='left', expand=True, fill='both')
-        scrollbar.pack(side='right', fill='y')
+        self.process_scrollbar.pack(side='right', fill='y')
+
+        # mouse wheel, resize and selection for the virtual window
+        self.process_tree.bind('<MouseWheel>', self.on_process_wheel)
+        self.process_tree.bind('<Button-4>', self.on_process_wheel)
+        self.process_tree.bind('<Button-5>', self.on_process_wheel)
+        self.process_tree.bind('<Configure>', self.on_process_tree_resize)
+        self.process_tree.bind('<<TreeviewSelect>>', self.on_process_select)
+
+        # double-click expands/collapses a subtree in tree view
+        self.process_tree.bind('<Double-1>', self.toggle_process_subtree)
 
         # context menu
         self.process_menu = tk.Menu(self.master, tearoff=0)
@@ -153,9 +2212,59 @@ class ModernUbuntuTaskManager:
 
         self.running_processes_label = ttk.Label(self.processes_frame, text="Running Processes: 0")
         self.running_processes_label.pack(side='bottom', anchor='w', padx=10, pady=5)
+
+        # Tk calls made by the last process list refresh
+        self.tree_calls_label = ttk.Label(self.processes_frame, text="Tree Updates: 0 Tk calls")
+        self.tree_calls_label.pack(side='bottom', anchor='w', padx=10, pady=5)
         
 
         
+    def setup_process_detail_pane(self):
+        detail_frame = ttk.Frame(self.processes_frame, width=260)
+        detail_frame.pack(side='right', fill='y', padx=(5, 10))
+
+        self.detail_title_label = ttk.Label(detail_frame, text="Select a process", font=("Helvetica", 11, "bold"))
+        self.detail_title_label.pack(anchor='w', pady=(0, 5))
+
+        # One small canvas per series; each holds a single line item that gets new coords
+        self.sparklines = {}
+        titles = {'cpu': "CPU %", 'rss': "RSS", 'io': "I/O bytes/s", 'fds': "Open FDs", 'ctx': "Context switches/s"}
+        for series in ProcessHistoryStore.SERIES:
+            label = ttk.Label(detail_frame, text=f"{titles[series]}: -")
+            label.pack(anchor='w')
+            canvas = tk.Canvas(detail_frame, width=240, height=40, bg='#2c3e50', highlightthickness=0)
+            canvas.pack(anchor='w', pady=(0, 6))
+            line = canvas.create_line(0, 0, 0, 0, fill='#3498db', width=1)
+            self.sparklines[series] = (titles[series], label, canvas, line)
+
+    def setup_diagnostics_tab(self):
+        diagnostics_info_frame = ttk.Frame(self.diagnostics_frame)
+        diagnostics_info_frame.pack(padx=10, pady=10, fill='x')
+
+        # The monitor's own footprint
+        self.self_usage_label = ttk.Label(diagnostics_info_frame, text="Monitor: -")
+        self.self_usage_label.pack(anchor='w')
+
+        # cProfile session of the Tk thread; collector time shows up only in the stage timings
+        profile_frame = ttk.Frame(diagnostics_info_frame)
+        profile_frame.pack(anchor='w', fill='x', pady=10)
+        self.profile_button = ttk.Button(profile_frame, text="Start Profiling", command=self.toggle_profiling)
+        self.profile_button.pack(side='left')
+        self.profile_label = ttk.Label(
+            profile_frame,
+            text=f"Profiles cover the Tk thread; collectors appear only in the stage timings below. "
+                 f"Written to {DEFAULT_PROFILE_DIR}"
+        )
+        self.profile_label.pack(side='left', padx=10)
+
+        # Per-stage timings over the last few hundred samples
+        columns = ('Stage', 'Samples', 'p50 ms', 'p95 ms', 'Max ms')
+        self.stage_tree = ttk.Treeview(self.diagnostics_frame, columns=columns, show='headings')
+        for col in columns:
+            self.stage_tree.heading(col, text=col)
+            self.stage_tree.column(col, width=120 if col != 'Stage' else 260, anchor='w' if col == 'Stage' else 'e')
+        self.stage_tree.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+
     def setup_system_tab(self):
         # System Information Labels
         system_info_frame = ttk.Frame(self.system_frame)
@@ -185,25 +2294,14 @@ class ModernUbuntuTaskManager:
         )
         mem_label.pack(anchor='w')
 
-        # Disk Info
-        disk_info = psutil.disk_partitions()
-        disk_details = []
-        counter = 1
-        for partition in disk_info:
-            usage = psutil.disk_usage(partition.mountpoint)
-            disk_details.append(
-                f"Drive {counter}: {partition.device}, Filesystem: {partition.fstype}, "
-                f"Total: {usage.total // (1024**3)} GB, Used: {usage.used // (1024**3)} GB, Free: {usage.free // (1024**3)} GB"
-            )
-            counter+=1
-
-        disk_label = ttk.Label(
+        # Disk Info, filled in and refreshed by the partition collector
+        self.disk_label = ttk.Label(
             system_info_frame, 
-            text="\n".join(disk_details), 
+            text="Reading partitions...", 
             justify='left', 
             wraplength=800 
         )
-        disk_label.pack(anchor='w', pady=(10, 0))
+        self.disk_label.pack(anchor='w', pady=(10, 0))
 
         # Resource Usage Progress Bars
         resource_frame = ttk.Frame(self.system_frame)
@@ -229,7 +2327,50 @@ class ModernUbuntuTaskManager:
         self.disk_usage_label = ttk.Label(resource_frame, text="0.0%")
         self.disk_usage_label.pack(anchor='w', padx=10)
 
+        # Per-core CPU bars, four to a row
+        core_frame = ttk.Frame(self.system_frame)
+        core_frame.pack(padx=10, pady=5, fill='x')
+        self.core_progress = []
+        self.core_labels = []
+        for core in range(psutil.cpu_count() or 1):
+            cell = ttk.Frame(core_frame)
+            cell.grid(row=core // 4, column=core % 4, padx=5, pady=2, sticky='ew')
+            core_frame.columnconfigure(core % 4, weight=1)
+            label = ttk.Label(cell, text=f"Core {core}: 0.0%", width=16)
+            label.pack(side='left')
+            bar = ttk.Progressbar(cell, length=120, mode='determinate')
+            bar.pack(side='left', fill='x', expand=True)
+            self.core_labels.append(label)
+            self.core_progress.append(bar)
+
+        # Memory breakdown, swap and per-device I/O
+        detail_frame = ttk.Frame(self.system_frame)
+        detail_frame.pack(padx=10, pady=5, fill='x')
+        self.memory_detail_label = ttk.Label(detail_frame, text="Memory breakdown: -", justify='left')
+        self.memory_detail_label.pack(anchor='w')
+        self.disk_io_label = ttk.Label(detail_frame, text="Disk I/O: -", justify='left')
+        self.disk_io_label.pack(anchor='w', pady=(5, 0))
+        self.sampler_label = ttk.Label(detail_frame, text="Sampler: -", justify='left')
+        self.sampler_label.pack(anchor='w', pady=(5, 0))
+
     def setup_performance_tab(self):
+        # Replay controls for the on-disk history
+        replay_frame = ttk.Frame(self.performance_frame)
+        replay_frame.pack(fill='x', padx=10, pady=5)
+
+        self.replay_var = tk.BooleanVar(value=False)
+        replay_check = ttk.Checkbutton(replay_frame, text="Replay history", variable=self.replay_var, command=self.toggle_replay)
+        replay_check.pack(side='left')
+        if self.metrics_store is None:
+            replay_check.state(['disabled'])
+
+        self.replay_scale = ttk.Scale(replay_frame, from_=0, to=0, orient='horizontal', command=self.scrub_history)
+        self.replay_scale.pack(side='left', fill='x', expand=True, padx=10)
+        self.replay_scale.state(['disabled'])
+
+        self.replay_label = ttk.Label(self.performance_frame, text="Live", justify='left')
+        self.replay_label.pack(anchor='w', padx=10)
+
         # Performance charts using matplotlib
         self.fig, (self.ax1, self.ax2, self.ax3) = plt.subplots(3, 1, figsize=(10, 8))
         self.fig.suptitle('System Performance')
@@ -237,28 +2378,33 @@ class ModernUbuntuTaskManager:
         # CPU Performance Chart
         self.ax1.set_title('CPU Usage')
         self.ax1.set_ylim(0, 100)
-        self.line1, = self.ax1.plot(self.cpu_history)
+        self.line1, = self.ax1.plot(self.cpu_history.view())
         self.ax1.set_ylabel('CPU Usage (%)')  
         self.ax1.set_xticks([])
 
         # Memory Performance Chart
         self.ax2.set_title('Memory Usage')
         self.ax2.set_ylim(0, 100)
-        self.line2, = self.ax2.plot(self.mem_history)
+        self.line2, = self.ax2.plot(self.mem_history.view())
         self.ax2.set_ylabel('Memory Usage (%)')  
         self.ax2.set_xticks([])
 
         # Disk Performance Chart
         self.ax3.set_title('Disk Usage')
         self.ax3.set_ylim(0, 100)
-        self.line3, = self.ax3.plot(self.disk_history)
+        self.line3, = self.ax3.plot(self.disk_history.view())
         self.ax3.set_ylabel('Disk Usage (%)') 
         self.ax3.set_xticks([])
 
+        # Frame-time counter for the chart redraws
+        self.performance_frame_label = ttk.Label(self.performance_frame, text="Render: -")
+        self.performance_frame_label.pack(side='bottom', anchor='w', padx=10, pady=5)
+
         # Embeded matplotlib figure in Tkinter
         canvas = FigureCanvasTkAgg(self.fig, master=self.performance_frame)
         canvas_widget = canvas.get_tk_widget()
         canvas_widget.pack(fill=tk.BOTH, expand=True)
+        self.performance_renderer = BlitChartRenderer(canvas, [self.line1, self.line2, self.line3])
 
     def setup_network_tab(self):
         # Network information frame
@@ -269,9 +2415,16 @@ class ModernUbuntuTaskManager:
         self.network_label = ttk.Label(network_info_frame, text="Network Details")
         self.network_label.pack(anchor='w')
 
-        # Network Speed Test Button
-        speed_test_btn = ttk.Button(network_info_frame, text="Run Speed Test", command=self.run_network_speedtest)
-        speed_test_btn.pack(anchor='w', pady=10)
+        # Current per-interface throughput
+        self.network_rate_label = ttk.Label(network_info_frame, text="", justify='left')
+        self.network_rate_label.pack(anchor='w', pady=(10, 0))
+
+        # Network Speed Test Button; doubles as the cancel button while a test runs
+        self.speed_test_button = ttk.Button(network_info_frame, text="Run Speed Test", command=self.run_network_speedtest)
+        self.speed_test_button.pack(anchor='w', pady=10)
+
+        self.speed_test_progress = ttk.Progressbar(network_info_frame, length=300, mode='determinate')
+        self.speed_test_progress.pack(anchor='w')
         
         # Speed Test Results Label
         self.speed_test_label = ttk.Label(network_info_frame, text="Click the button above to run Speed Test ")
@@ -282,43 +2435,67 @@ class ModernUbuntuTaskManager:
         self.network_fig.suptitle('Network Traffic')
         
         self.network_ax.set_title('Network Sent/Received')
-        self.network_ax.set_ylim(0.01,5)  
-        # self.network_ax.set_ylim(0, max(max(self.network_history['sent']), max(self.network_history['recv'])) * 1.1)
-
-        sent_list = [ (x/400000) for x in self.network_history['sent']]
-        rcv_list = [ (x/400000) for x in self.network_history['recv']]
-        self.network_sent_line, = self.network_ax.plot(sent_list , label='Sent')
-        self.network_recv_line, = self.network_ax.plot(rcv_list, label='Received')
-        self.network_ax.legend()
+        self.network_ax.set_ylim(0, 1)
+
+        self.network_sent_line, = self.network_ax.plot(self.network_history['sent'].view(), label='Sent (total)', linewidth=2)
+        self.network_recv_line, = self.network_ax.plot(self.network_history['recv'].view(), label='Received (total)', linewidth=2)
+        self.network_ax.legend(loc='upper left', fontsize='small')
         self.network_ax.set_ylabel("MBps") 
         self.network_ax.set_xticks([])
 
+        # Frame-time counter for the chart redraws
+        self.network_frame_label = ttk.Label(self.network_frame, text="Render: -")
+        self.network_frame_label.pack(side='bottom', anchor='w', padx=10, pady=5)
+
         # Embeded network matplotlib figure in Tkinter
         network_canvas = FigureCanvasTkAgg(self.network_fig, master=self.network_frame)
         network_canvas_widget = network_canvas.get_tk_widget()
         network_canvas_widget.pack(fill=tk.BOTH, expand=True)
+        self.network_renderer = BlitChartRenderer(
+            network_canvas, [self.network_sent_line, self.network_recv_line], rescale_axes=[self.network_ax]
+        )
 
     
 
     def run_network_speedtest(self):
-        def perform_speedtest():
-            self.speed_test_label.config(text="Running speed test... please wait")
-            try:
-                st = speedtest.Speedtest()
-                download_speed = st.download() / 1_000_000  # Convert to Mbps
-                upload_speed = st.upload() / 1_000_000  # Convert to Mbps
-                ping = st.results.ping
-
-                self.master.after(0, lambda: self.network_label.config(
-                    text=f"Download: {download_speed:.2f} Mbps\n"
-                         f"Upload: {upload_speed:.2f} Mbps\n"
-                         f"Ping: {ping} ms"
-                ))
+        """Start a speed test, or cancel the one that is running"""
+        if self.speedtest.running:
+            self.speedtest.cancel()
+            self.speed_test_button.config(text="Cancelling...")
+            self.speed_test_button.state(['disabled'])
+            return
+        self.speedtest.start()
+        self.speed_test_button.config(text="Cancel Speed Test")
+        self.speed_test_progress['value'] = 0
+
+    def on_speedtest_event(self, event):
+        """Progress and results from the speed test worker, on the Tk thread"""
+        phase = event['phase']
+        if phase == 'starting':
+            self.speed_test_label.config(text=f"Running speed test against {event['target']}...")
+        elif phase in ('download', 'upload'):
+            # Download fills the first half of the bar, upload the second
+            self.speed_test_progress['value'] = (50 if phase == 'upload' else 0) + event['fraction'] * 50
+            rate = f" at {event['mbps']:.2f} Mbps" if event['mbps'] is not None else ""
+            self.speed_test_label.config(text=f"Testing {phase}: {event['fraction'] * 100:.0f}%{rate}")
+        else:
+            self.speed_test_button.config(text="Run Speed Test")
+            self.speed_test_button.state(['!disabled'])
+            if phase == 'done':
+                self.speed_test_progress['value'] = 100
+                self.network_label.config(
+                    text=f"Download: {event['download']:.2f} Mbps\n"
+                         f"Upload: {event['upload']:.2f} Mbps\n"
+                         f"Ping: {event['ping']:.1f} ms ({event['server']})"
+                )
                 self.speed_test_label.config(text="Speed Test Complete!")
-            except Exception as e:
-                messagebox.showerror("Speed Test Error", str(e))
-
-        threading.Thread(target=perform_speedtest, daemon=True).start()
+            elif phase == 'cancelled':
+                self.speed_test_progress['value'] = 0
+                self.speed_test_label.config(text="Speed test cancelled")
+            else:
+                self.speed_test_progress['value'] = 0
+                self.speed_test_label.config(text="Speed test failed")
+                messagebox.showerror("Speed Test Error", event['message'])
 
     def show_process_menu(self, event):
         """Show context menu for processes"""
@@ -348,145 +2525,569 @@ class ModernUbuntuTaskManager:
             messagebox.showwarning("Warning", "No process selected")
             return
         
-        pid = self.process_tree.item(selected_item)['values'][0]
-        try:
-            parent = psutil.Process(int(pid))
-            for child in parent.children(recursive=True):
-                child.terminate()
-            parent.terminate()
-            messagebox.showinfo("Success", f"Process tree for {pid} terminated")
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not end process tree: {e}")
-
-    def start_periodic_updates(self):
-        """Start periodic system updates"""
-        def update_loop():
-            while True:
-                # Update process list
-                self.master.after(0, self.update_process_list)
-                
-                # # Update system resources
-                # cpu_percent = psutil.cpu_percent()
-                # mem_percent = psutil.virtual_memory().percent
-                # disk_percent = psutil.disk_usage('/').percent
-
-                # Update CPU usage
-                cpu_percent = psutil.cpu_percent(interval=None)
-                self.cpu_progress['value'] = cpu_percent
-                self.cpu_usage_label.config(text=f"{cpu_percent:.1f}%")
-
-                # Update memory usage
-                mem_percent = psutil.virtual_memory().percent
-                self.mem_progress['value'] = mem_percent
-                self.mem_usage_label.config(text=f"{mem_percent:.1f}%")
-
-                # Update disk usage
-                disk_percent = psutil.disk_usage('/').percent
-                self.disk_progress['value'] = disk_percent
-                self.disk_usage_label.config(text=f"{disk_percent:.1f}%")
-                            
-                # Network traffic
-                net_io = psutil.net_io_counters()
-                
-                # Update UI elements
-                self.master.after(0, lambda: self.update_system_ui(
-                    cpu_percent, self.mem_progress['value'], self.disk_progress['value'], 
-                    net_io.bytes_sent, net_io.bytes_recv
-                ))
-                
-                time.sleep(1)  # Update every second
-
-        update_thread = threading.Thread(target=update_loop, daemon=True)
-        update_thread.start()
-
-    def update_system_ui(self, cpu_percent, mem_percent, disk_percent, bytes_sent, bytes_recv):
+        pid = int(self.process_tree.item(selected_item)['values'][0])
+        # Descendants come from the PPID index, not another scan of the process table
+        snapshot = self.process_index.snapshot
+        iid_of = dict(zip(snapshot.pids.tolist(), snapshot.iids))
+        iids = [iid_of[child] for child in self.process_index.tree.subtree(pid) if child in iid_of]
+        same_process = self.process_collector.backend.same_process
+
+        # Waiting for the escalation timeout happens off the Tk thread
+        def kill_tree():
+            # Always post a result, or the user is never told the kill went wrong
+            try:
+                result = terminate_tree(pid, iids, same_process)
+            except Exception as e:
+                traceback.print_exc()
+                result = {'pid': pid, 'error': e}
+            self.scheduler.results.put(('tree_kill', result))
+
+        threading.Thread(target=kill_tree, daemon=True).start()
+
+    def on_tree_kill_done(self, result):
+        if 'error' in result:
+            messagebox.showerror("Error", f"Could not end process tree for {result['pid']}: {result['error']}")
+            return
+        skipped = ""
+        if result['reused']:
+            skipped = "\nSkipped PIDs reused by newer processes: " + ", ".join(str(pid) for pid in result['reused'])
+        if result['failed']:
+            messagebox.showerror(
+                "Error",
+                f"Could not end process tree for {result['pid']}: no permission for PIDs "
+                + ", ".join(str(pid) for pid in result['failed']) + skipped
+            )
+        else:
+            messagebox.showinfo(
+                "Success",
+                f"Process tree for {result['pid']} terminated "
+                f"({result['terminated']} exited on SIGTERM, {len(result['killed'])} needed SIGKILL)" + skipped
+            )
+
+    def update_system_ui(self, system):
         """Update system UI components"""
-        # Update progress bars
-        self.cpu_progress['value'] = cpu_percent
+        cpu_percent, mem_percent, disk_percent = system['cpu'], system['mem'], system['disk']
+        net_rates = system['net']
+
+        # Update progress bars; the CPU bar has its own faster collector
         self.mem_progress['value'] = mem_percent
+        self.mem_usage_label.config(text=f"{mem_percent:.1f}%")
         self.disk_progress['value'] = disk_percent
+        self.disk_usage_label.config(text=f"{disk_percent:.1f}%")
 
-        # Update performance history lists
-        self.cpu_history = self.cpu_history[1:] + [cpu_percent]
-        self.mem_history = self.mem_history[1:] + [mem_percent]
-        self.disk_history = self.disk_history[1:] + [disk_percent]
+        # Update performance history buffers
+        self.cpu_history.append(cpu_percent)
+        self.mem_history.append(mem_percent)
+        self.disk_history.append(disk_percent)
         
-        # Update network history (convert to KB/s)
-        self.network_history['sent'] = self.network_history['sent'][1:] + [bytes_sent / 1024]
-        self.network_history['recv'] = self.network_history['recv'][1:] + [bytes_recv / 1024]
-
-        # Update performance charts
-        self.line1.set_ydata(self.cpu_history)
-        self.line2.set_ydata(self.mem_history)
-        self.line3.set_ydata(self.disk_history)
+        # Update network history in MB/s
+        self.update_network_history(net_rates)
+
+        # Record to the on-disk history
+        if self.metrics_store is not None:
+            self.metrics_store.append(
+                time.time(), cpu_percent, mem_percent, disk_percent,
+                self.network_history['sent'].latest(), self.network_history['recv'].latest(),
+                top_processes(self.process_snapshot, METRICS_TOP_N)
+            )
+
+        if self.alert_engine is not None:
+            self.handle_alerts(self.alert_engine.update(system_alert_metrics(system)))
+
+        # Hand the sample to the metrics endpoint; scrapes never trigger collection
+        if self.exporter is not None and self.process_snapshot is not None:
+            self.exporter.publish(system, self.process_snapshot)
+
+        # Update performance charts, unless a replay is showing
+        if not self.replay_var.get():
+            self.line1.set_ydata(self.cpu_history.view())
+            self.line2.set_ydata(self.mem_history.view())
+            self.line3.set_ydata(self.disk_history.view())
         
         # Update network chart
-        sent_list = [ (x/400000) for x in self.network_history['sent']]
-        rcv_list = [ (x/400000) for x in self.network_history['recv']]
-        self.network_sent_line.set_ydata(sent_list)
-        self.network_recv_line.set_ydata(rcv_list)
-
-        # Redraw charts
-        self.ax1.relim()
-        self.ax1.autoscale_view()
-        self.ax2.relim()
-        self.ax2.autoscale_view()
-        self.ax3.relim()
-        self.ax3.autoscale_view()
-        
-        self.network_ax.relim()
-        self.network_ax.autoscale_view()
+        self.network_sent_line.set_ydata(self.network_history['sent'].view())
+        self.network_recv_line.set_ydata(self.network_history['recv'].view())
+        for nic, (sent_line, recv_line) in self.nic_lines.items():
+            sent_line.set_ydata(self.nic_history[nic]['sent'].view())
+            recv_line.set_ydata(self.nic_history[nic]['recv'].view())
+
+        # Redraw charts, skipping the ones on hidden tabs
+        self.render_visible_charts()
+
+    def toggle_replay(self):
+        """Switch the performance charts between live data and the on-disk history"""
+        if self.replay_var.get():
+            self.metrics_store.flush()
+            total = len(self.metrics_store)
+            self.replay_scale.configure(from_=min(self.history_length, total), to=total)
+            self.replay_scale.state(['!disabled'])
+            self.replay_scale.set(total)
+            self.scrub_history(total)
+        else:
+            self.replay_scale.state(['disabled'])
+            self.replay_label.config(text="Live")
+            self.line1.set_ydata(self.cpu_history.view())
+            self.line2.set_ydata(self.mem_history.view())
+            self.line3.set_ydata(self.disk_history.view())
+            self.render_visible_charts()
+
+    def scrub_history(self, value):
+        """Show the history window ending at record `value`; only that window is read"""
+        if not self.replay_var.get():
+            return
+        end = int(float(value))
+        start = max(0, end - self.history_length)
+        records = self.metrics_store.read(start, end - start)
+        if not len(records):
+            self.replay_label.config(text="Replay: no history recorded yet")
+            return
 
-        self.fig.canvas.draw()
-        self.network_fig.canvas.draw()
+        # Left-pad short windows so the lines keep their length
+        for line, field in ((self.line1, 'cpu'), (self.line2, 'mem'), (self.line3, 'disk')):
+            ydata = np.zeros(self.history_length)
+            ydata[self.history_length - len(records):] = records[field]
+            line.set_ydata(ydata)
+
+        last = records[-1]
+        first_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(records['timestamp'][0]))
+        last_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(last['timestamp']))
+        top = ", ".join(
+            f"{name.decode(errors='replace')} ({pid}) {cpu:.1f}%"
+            for pid, cpu, name in zip(last['top_pids'], last['top_cpu'], last['top_names']) if pid
+        )
+        self.replay_label.config(text=f"Replay: {first_time} to {last_time}\nTop processes: {top or '-'}")
+        self.render_visible_charts()
+
+    def update_network_history(self, net_rates):
+        """Append the latest rates, adding a chart line pair for each new interface and dropping vanished ones"""
+        total_sent = sum(sent for sent, recv in net_rates.values())
+        total_recv = sum(recv for sent, recv in net_rates.values())
+        self.network_history['sent'].append(total_sent / 1_000_000)
+        self.network_history['recv'].append(total_recv / 1_000_000)
+
+        details = [f"Total: sent {total_sent / 1_000_000:.3f} MBps, received {total_recv / 1_000_000:.3f} MBps"]
+        for nic, (sent, recv) in sorted(net_rates.items()):
+            if nic not in self.nic_history:
+                self.nic_history[nic] = {'sent': RingBuffer(self.history_length), 'recv': RingBuffer(self.history_length)}
+                sent_line, = self.network_ax.plot(self.nic_history[nic]['sent'].view(), linestyle='--', linewidth=1, label=f"{nic} sent")
+                recv_line, = self.network_ax.plot(self.nic_history[nic]['recv'].view(), linestyle=':', linewidth=1, label=f"{nic} received")
+                self.network_ax.legend(loc='upper left', fontsize='small')
+                self.network_renderer.add_line(sent_line)
+                self.network_renderer.add_line(recv_line)
+                self.nic_lines[nic] = (sent_line, recv_line)
+            self.nic_history[nic]['sent'].append(sent / 1_000_000)
+            self.nic_history[nic]['recv'].append(recv / 1_000_000)
+            details.append(f"{nic}: sent {sent / 1_000_000:.3f} MBps, received {recv / 1_000_000:.3f} MBps")
+
+        # Interfaces that went away (container veths, unplugged adapters) lose their lines and legend entries
+        gone = [nic for nic in self.nic_history if nic not in net_rates]
+        for nic in gone:
+            for line in self.nic_lines.pop(nic):
+                self.network_renderer.remove_line(line)
+            del self.nic_history[nic]
+        if gone:
+            self.network_ax.legend(loc='upper left', fontsize='small')
+        self.network_rate_label.config(text="\n".join(details))
+
+    def render_visible_charts(self, event=None):
+        """Blit the chart on the selected notebook tab, if it has one"""
+        selected = self.notebook.select()
+        if selected == str(self.performance_frame):
+            self.performance_renderer.render()
+            self.instrumentation.record('render: performance charts', self.performance_renderer.frame_ms)
+            self.performance_frame_label.config(text=self.performance_renderer.describe())
+        elif selected == str(self.network_frame):
+            self.network_renderer.render()
+            self.instrumentation.record('render: network chart', self.network_renderer.frame_ms)
+            self.network_frame_label.config(text=self.network_renderer.describe())
+
+
+    def apply_process_rows(self, rows):
+        """Diff rows against the tree; insert new, delete exited, update changed"""
+        old_rows = self.process_rows
+
+        # Exited processes go in a single delete call
+        gone = [iid for iid in old_rows if iid not in rows]
+        if gone:
+            self.process_tree.delete(*gone)
+
+        # Rows that stayed in the same relative order only need new ones slotted in
+        kept_old = [iid for iid in old_rows if iid in rows]
+        kept_new = [iid for iid in rows if iid in old_rows]
+        reordered = kept_old != kept_new
+
+        inserted = updated = moved = 0
+        for index, (iid, values) in enumerate(rows.items()):
+            old_values = old_rows.get(iid)
+            if old_values is None:
+                self.process_tree.insert('', index, iid=iid, values=values)
+                inserted += 1
+                continue
+            if reordered:
+                self.process_tree.move(iid, '', index)
+                moved += 1
+            if old_values != values:
+                self.process_tree.item(iid, values=values)
+                updated += 1
+
+        self.process_rows = rows
+        return inserted, len(gone), updated + moved
+
+    def poll_collector_results(self):
+        """Hand results from the scheduler thread to the matching UI update"""
+        handlers = {
+            'processes': self.update_process_list,
+            'cpu': self.update_cpu_ui,
+            'system': self.update_system_ui,
+            'percpu': self.update_core_ui,
+            'diskio': self.update_disk_io_ui,
+            'memory': self.update_memory_ui,
+            'partitions': self.update_partitions_ui,
+            'tree_kill': self.on_tree_kill_done,
+            'detail': self.update_process_detail,
+            'speedtest': self.on_speedtest_event
+        }
+        while True:
+            try:
+                name, value = self.scheduler.results.get_nowait()
+            except queue.Empty:
+                break
+            start = time.perf_counter()
+            # Like run_job: a failing handler must not end the poll loop that drives every other update
+            try:
+                handlers[name](value)
+            except (psutil.Error, OSError) as e:
+                print(f"{name} update failed: {e}", file=sys.stderr)
+            except Exception:
+                print(f"{name} update raised:", file=sys.stderr)
+                traceback.print_exc()
+            self.instrumentation.record(f"ui: {name}", (time.perf_counter() - start) * 1000)
+
+        self.sampler_label.config(text="Sampler: " + ", ".join(
+            f"{job.collector.name} "
+            + ("paused" if job.paused else f"every {job.collector.interval.interval:.2f} s")
+            + (f" ({job.skipped} skipped)" if job.skipped else "")
+            for job in self.scheduler.jobs
+        ) + f" - {self.scheduler.overhead():.2f}% CPU")
+        self.master.after(100, self.poll_collector_results)
+
+    def update_diagnostics(self):
+        """Refresh the stage table and the monitor's own RSS/CPU once a second"""
+        if self.notebook.select() == str(self.diagnostics_frame):
+            try:
+                with self.own_process.oneshot():
+                    rss = self.own_process.memory_info().rss
+                    cpu = self.own_process.cpu_percent()
+                    threads = self.own_process.num_threads()
+            except psutil.Error:
+                pass
+            else:
+                self.self_usage_label.config(
+                    text=f"Monitor: {rss / 1024 ** 2:.1f} MB RSS, {cpu:.1f}% CPU, {threads} threads"
+                         f" (collectors {self.scheduler.overhead():.2f}% of one core)"
+                )
+
+            for stage, samples, p50, p95, peak in self.instrumentation.stats():
+                values = (stage, samples, f"{p50:.2f}", f"{p95:.2f}", f"{peak:.2f}")
+                if self.stage_tree.exists(stage):
+                    self.stage_tree.item(stage, values=values)
+                else:
+                    self.stage_tree.insert('', 'end', iid=stage, values=values)
+        self.master.after(1000, self.update_diagnostics)
+
+    def toggle_profiling(self):
+        """Start a cProfile session, or stop it and dump the stats"""
+        if not self.instrumentation.profiling:
+            self.instrumentation.start_profile()
+            self.profile_button.config(text="Stop Profiling and Save")
+            self.profile_label.config(text="Profiling the Tk thread (collectors appear only in the stage timings)...")
+            return
 
+        self.profile_button.config(text="Start Profiling")
+        try:
+            path = self.instrumentation.stop_profile(DEFAULT_PROFILE_DIR)
+        except OSError as e:
+            self.profile_label.config(text=f"Could not save profile: {e}")
+            return
+        self.profile_label.config(text=f"Saved {path}" if path else "Nothing was recorded")
+
+    def on_tab_changed(self, event=None):
+        self.update_paused_collectors()
+        self.render_visible_charts()
+        if self.process_list_stale and self.notebook.select() == str(self.processes_frame):
+            self.show_process_snapshot(self.process_snapshot)
+
+    def update_paused_collectors(self):
+        """Pause collectors whose only consumers are a hidden tab"""
+        selected = self.notebook.select()
+        processes_hidden = selected != str(self.processes_frame)
+        system_hidden = selected != str(self.system_frame)
+        # The on-disk history, the metrics endpoint and the process and zombie alert rules need snapshots even while the list is hidden
+        keep_processes = self.metrics_store is not None or self.exporter is not None or (
+            self.alert_engine is not None and self.alert_engine.needs_processes
+        )
+        self.scheduler.set_paused('processes', processes_hidden and not keep_processes)
+        self.scheduler.set_paused('detail', processes_hidden)
+        for name in ('cpu', 'percpu', 'diskio', 'memory', 'partitions'):
+            self.scheduler.set_paused(name, system_hidden)
+
+    def handle_alerts(self, events):
+        """Log new transitions and show every firing alert in the banner"""
+        if events and self.alert_notifier is not None:
+            self.alert_notifier.notify(events)
+        if not events and not self.alert_banner.winfo_ismapped():
+            return
+        active = self.alert_engine.active()
+        if active:
+            shown = [format_alert(event) for event in active[:3]]
+            if len(active) > 3:
+                shown.append(f"... and {len(active) - 3} more")
+            self.alert_banner.config(text="\n".join(shown))
+            self.alert_banner.pack(before=self.notebook, fill='x', padx=15, pady=(5, 0))
+        else:
+            self.alert_banner.pack_forget()
+
+    def on_close(self):
+        """Stop sampling cleanly, flush the on-disk history and close the window"""
+        self.scheduler.stop()
+        self.speedtest.stop()
+        if self.exporter is not None:
+            self.exporter.stop()
+        if self.alert_notifier is not None:
+            self.alert_notifier.close()
+        if self.metrics_store is not None:
+            self.metrics_store.close()
+            self.metrics_store = None
+        self.master.destroy()
+
+    def update_cpu_ui(self, cpu_percent):
+        self.cpu_progress['value'] = cpu_percent
+        self.cpu_usage_label.config(text=f"{cpu_percent:.1f}%")
+
+    def update_core_ui(self, cores):
+        for core, percent in enumerate(cores[:len(self.core_progress)]):
+            self.core_progress[core]['value'] = percent
+            self.core_labels[core].config(text=f"Core {core}: {percent:.1f}%")
+
+    def update_memory_ui(self, memory):
+        gb = 1024 ** 3
+        self.memory_detail_label.config(text=(
+            f"Memory breakdown: used {memory['used'] / gb:.2f} GB, cached {memory['cached'] / gb:.2f} GB, "
+            f"buffers {memory['buffers'] / gb:.2f} GB, available {memory['available'] / gb:.2f} GB "
+            f"of {memory['total'] / gb:.2f} GB\n"
+            f"Swap: {memory['swap_used'] / gb:.2f} GB of {memory['swap_total'] / gb:.2f} GB ({memory['swap_percent']:.1f}%)"
+        ))
+
+    def update_disk_io_ui(self, rates):
+        lines = [
+            f"{disk}: read {read / 1_000_000:.2f} MB/s ({read_iops:.0f} IOPS), write {write / 1_000_000:.2f} MB/s ({write_iops:.0f} IOPS)"
+            for disk, (read, write, read_iops, write_iops) in sorted(rates.items())
+        ]
+        self.disk_io_label.config(text="Disk I/O:\n" + ("\n".join(lines) or "no devices"))
+
+    def update_partitions_ui(self, partitions):
+        gb = 1024 ** 3
+        self.disk_label.config(text="\n".join(
+            f"Drive {counter}: {device}, Filesystem: {fstype}, "
+            f"Total: {total // gb} GB, Used: {used // gb} GB, Free: {free // gb} GB"
+            for counter, (device, mountpoint, fstype, total, used, free, percent) in enumerate(partitions, 1)
+        ))
+
+    def render_process_window(self):
+        """Materialize only the rows in view (plus overscan) from the snapshot"""
+        snapshot = self.process_snapshot
+        if snapshot is None:
+            return
+        start = time.perf_counter()
+
+        total = len(self.process_order)
+        self.process_offset = max(0, min(self.process_offset, total - self.visible_process_rows))
+        window = self.process_order[self.process_offset:self.process_offset + self.visible_process_rows + PROCESS_OVERSCAN]
+
+        rows = {}
+        index = self.process_index
+        if index.tree_mode:
+            # Indented names and subtree totals
+            cpu, mem, threads = index.totals
+            tree = index.tree
+            for i in window:
+                pid = int(snapshot.pids[i])
+                marker = ('\u25b8 ' if pid in index.collapsed else '\u25be ') if pid in tree.children else '  '
+                rows[snapshot.iids[i]] = (
+                    pid,
+                    '    ' * index.depths[i] + marker + snapshot.names[i],
+                    f"{cpu[i]:.2f}",
+                    f"{mem[i]:.2f}",
+                    int(threads[i]),
+                    snapshot.statuses[i]
+                )
+        else:
+            for i in window:
+                rows[snapshot.iids[i]] = (
+                    int(snapshot.pids[i]),
+                    snapshot.names[i],
+                    f"{snapshot.cpu[i]:.2f}",
+                    f"{snapshot.mem[i]:.2f}",
+                    int(snapshot.threads[i]),
+                    snapshot.statuses[i]
+                )
+
+        inserted, deleted, updated = self.apply_process_rows(rows)
+        tk_calls = inserted + updated + (1 if deleted else 0)
+
+        # Keep the selection when its row scrolls back into the window
+        if self.selected_process_iid in rows and self.process_tree.selection() != (self.selected_process_iid,):
+            self.process_tree.selection_set(self.selected_process_iid)
+            tk_calls += 1
+
+        if total:
+            self.process_scrollbar.set(self.process_offset / total, (self.process_offset + self.visible_process_rows) / total)
+        else:
+            self.process_scrollbar.set(0, 1)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.instrumentation.record('render: process list', elapsed_ms)
+        self.tree_calls_label.config(
+            text=f"Tree Updates: {tk_calls} Tk calls (+{inserted} / -{deleted} / ~{updated}) in {elapsed_ms:.1f} ms"
+                 f" (collected off-thread in {snapshot.collect_ms:.1f} ms), "
+                 f"rows {self.process_offset + 1}-{self.process_offset + len(rows)} of {total}"
+        )
 
-    def update_process_list(self):
+    def scroll_processes(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'/'pages')"""
+        total = len(self.process_order)
+        if args[0] == 'moveto':
+            self.process_offset = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = self.visible_process_rows if args[2] == 'pages' else 1
+            self.process_offset += int(args[1]) * step
+        self.render_process_window()
+
+    def on_process_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.scroll_processes('scroll', -3, 'units')
+        else:
+            self.scroll_processes('scroll', 3, 'units')
+        return 'break'
+
+    def on_process_tree_resize(self, event):
+        # heading row takes about one row of height
+        visible = max(1, event.height // PROCESS_ROW_HEIGHT - 1)
+        if visible != self.visible_process_rows:
+            self.visible_process_rows = visible
+            self.render_process_window()
+
+    def on_process_select(self, event):
+        selection = self.process_tree.selection()
+        if selection and selection[0] != self.selected_process_iid:
+            self.selected_process_iid = selection[0]
+            self.detail_collector.watch(selection[0])
+            self.process_history.track(selection[0])
+            self.update_detail_pane()
+
+    def update_process_detail(self, detail):
+        if detail is None:
+            return
+        iid, io_rate, fds, ctx_rate = detail
+        self.process_history.record_detail(iid, io_rate, fds, ctx_rate)
+        if iid == self.selected_process_iid:
+            self.update_detail_pane()
+
+    def update_detail_pane(self):
+        """Redraw the sparklines of the selected process"""
+        iid = self.selected_process_iid
+        history = self.process_history.get(iid) if iid else None
+        if history is None:
+            return
+        values = self.process_tree.item(iid)['values'] if self.process_tree.exists(iid) else None
+        name = values[1].strip().lstrip('\u25b8\u25be ') if values else ''
+        self.detail_title_label.config(text=f"PID {iid.split(':')[0]} {name}")
+
+        for series, (title, label, canvas, line) in self.sparklines.items():
+            data = history[series].view()
+            latest = data[-1]
+            if np.isnan(latest):
+                label.config(text=f"{title}: -")
+            elif series in ('rss', 'io'):
+                label.config(text=f"{title}: {latest / 1024 ** 2:.1f} MB")
+            else:
+                label.config(text=f"{title}: {latest:.1f}")
+            draw_sparkline(canvas, line, data)
+
+    def sort_processes(self, column):
+        """Heading click: sort by that column, or flip the direction if it already is"""
+        index = self.process_index
+        if index.sort_column == column:
+            index.descending = not index.descending
+        else:
+            # Numbers read best biggest-first, text A-Z
+            index.sort_column = column
+            index.descending = column in ('CPU %', 'Memory %', 'Threads')
+        self.update_sort_headings()
+        self.refresh_process_order(reset_offset=True)
+
+    def update_sort_headings(self):
+        index = self.process_index
+        for col in ProcessIndex.SORT_COLUMNS:
+            arrow = (' \u25bc' if index.descending else ' \u25b2') if col == index.sort_column else ''
+            self.process_tree.heading(col, text=col + arrow)
+
+    def toggle_top_k(self):
+        if self.top_k_var.get():
+            self.process_index.top_k = PROCESS_TOP_K
+            self.process_index.sort_column, self.process_index.descending = 'CPU %', True
+            self.update_sort_headings()
+        else:
+            self.process_index.top_k = None
+        self.refresh_process_order(reset_offset=True)
+
+    def toggle_tree_mode(self):
+        self.process_index.tree_mode = self.tree_mode_var.get()
+        self.refresh_process_order(reset_offset=True)
+
+    def toggle_process_subtree(self, event):
+        item = self.process_tree.identify_row(event.y)
+        if not item or not self.process_index.tree_mode:
+            return
+        pid = int(self.process_tree.item(item)['values'][0])
+        if pid in self.process_index.collapsed:
+            self.process_index.collapsed.discard(pid)
+        else:
+            self.process_index.collapsed.add(pid)
+        self.refresh_process_order()
+
+    def refresh_process_order(self, reset_offset=False):
+        """Recompute the displayed order from the current snapshot and render it"""
+        self.process_index.filter_text = self.process_filter_var.get()
+        self.process_order = self.process_index.order()
+        if reset_offset:
+            self.process_offset = 0
+        self.render_process_window()
+
+    def update_process_list(self, snapshot):
         """Update the process list in the treeview and display process types"""
-        # Clear existing items
-        for i in self.process_tree.get_children():
-            self.process_tree.delete(i)
+        self.process_snapshot = snapshot
+        if self.alert_engine is not None:
+            self.handle_alerts(self.alert_engine.update_processes(snapshot))
 
-        # Initialize process counts
-        process_counts = {
-            'total': 0,
-            'running': 0,
-            'sleeping': 0,
-            'stopped': 0,
-            'zombie': 0,
-            'idle': 0,
-            'unknown': 0
-        }
+        # A hidden list is only kept for its other consumers; it is rebuilt when the tab is shown
+        if self.notebook.select() != str(self.processes_frame):
+            self.process_list_stale = True
+            return
+        self.show_process_snapshot(snapshot)
 
-        # Get and sort processes
-        for proc in sorted(psutil.process_iter(['pid', 'name', 'status']), key=lambda x: x.info['pid']):
-            process_counts['total'] += 1
-            try:
-                # Get CPU, memory usage, threads, and status
-                cpu_percent = proc.cpu_percent()
-                mem_percent = proc.memory_percent()
-                threads = proc.num_threads()
-                status = proc.info['status']
-
-                # Increment the count for the specific process status
-                if status in process_counts:
-                    process_counts[status] += 1
-                else:
-                    process_counts['unknown'] += 1
-
-                # Only add processes with some resource usage
-                if cpu_percent > 0 or mem_percent > 0:
-                    self.process_tree.insert('', 'end', values=(
-                        proc.info['pid'],
-                        proc.info['name'],
-                        f"{cpu_percent:.2f}",
-                        f"{mem_percent:.2f}",
-                        threads,
-                        status
-                    ))
+    def show_process_snapshot(self, snapshot):
+        """Render a snapshot into the process list, its history and the count labels"""
+        self.process_list_stale = False
+        process_counts = snapshot.counts
 
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
+        self.process_index.set_snapshot(snapshot)
+        self.refresh_process_order()
+
+        # Per-process history; the selected process is kept even while idle
+        keep = (self.selected_process_iid,) if self.selected_process_iid else ()
+        self.process_history.record(snapshot, keep)
+        self.update_detail_pane()
 
         # Update labels for all process counts
         self.total_processes_label.config(text=f"Total Processes: {process_counts['total']}")
@@ -497,9 +3098,374 @@ class ModernUbuntuTaskManager:
         self.idle_processes_label.config(text=f"Idle Processes: {process_counts['idle']}")
         self.unknown_processes_label.config(text=f"Unknown Status Processes: {process_counts['unknown']}")
 
-def main():
+# Flat column layout for --format csv
+HEADLESS_CSV_FIELDS = [
+    'timestamp', 'cpu', 'mem', 'disk', 'net_sent', 'net_recv',
+    'processes', 'running', 'sleeping', 'stopped', 'zombie', 'idle', 'unknown',
+    'top_pid', 'top_name', 'top_cpu'
+]
+
+
+def headless_record(system, snapshot, top_count=5):
+    """One output record: system readings, process counts and the busiest processes"""
+    return {
+        'timestamp': round(time.time(), 3),
+        'cpu': round(system['cpu'], 1),
+        'mem': system['mem'],
+        'disk': system['disk'],
+        'net_sent': round(sum(sent for sent, recv in system['net'].values()), 1),
+        'net_recv': round(sum(recv for sent, recv in system['net'].values()), 1),
+        'nics': {nic: {'sent': round(sent, 1), 'recv': round(recv, 1)} for nic, (sent, recv) in system['net'].items()},
+        'processes': snapshot.counts,
+        'top': [
+            {'pid': pid, 'name': name, 'cpu': round(cpu, 2), 'mem': round(mem, 2)}
+            for pid, cpu, mem, name in top_processes(snapshot, top_count)
+        ]
+    }
+
+
+def csv_row(record):
+    top = record['top'][0] if record['top'] else {'pid': '', 'name': '', 'cpu': ''}
+    row = {key: record[key] for key in ('timestamp', 'cpu', 'mem', 'disk', 'net_sent', 'net_recv')}
+    row['processes'] = record['processes']['total']
+    for status in ('running', 'sleeping', 'stopped', 'zombie', 'idle', 'unknown'):
+        row[status] = record['processes'][status]
+    row.update(top_pid=top['pid'], top_name=top['name'], top_cpu=top['cpu'])
+    return row
+
+
+# Processes exported per scrape; a label set per process, so keep it small
+EXPORT_TOP_N = 10
+
+
+def prometheus_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(record, collect_ms):
+    """Render an exporter record in the Prometheus text exposition format"""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP task_manager_{name} {help_text}")
+        lines.append(f"# TYPE task_manager_{name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{prometheus_label(val)}"' for key, val in labels)
+            lines.append(f"task_manager_{name}{{{label_text}}} {value}" if labels else f"task_manager_{name} {value}")
+
+    metric('cpu_percent', 'gauge', "System-wide CPU utilisation.", [((), record['cpu'])])
+    metric('memory_percent', 'gauge', "Physical memory in use.", [((), record['mem'])])
+    metric('disk_percent', 'gauge', "Usage of the root filesystem.", [((), record['disk'])])
+    metric('network_sent_bytes_per_second', 'gauge', "Send rate per interface.",
+           [((('interface', nic),), rates['sent']) for nic, rates in sorted(record['nics'].items())])
+    metric('network_received_bytes_per_second', 'gauge', "Receive rate per interface.",
+           [((('interface', nic),), rates['recv']) for nic, rates in sorted(record['nics'].items())])
+    metric('processes', 'gauge', "Processes by status.",
+           [((('status', status),), count) for status, count in record['processes'].items() if status != 'total'])
+    metric('process_cpu_percent', 'gauge', f"CPU of the {EXPORT_TOP_N} busiest processes.",
+           [((('pid', top['pid']), ('name', top['name'])), top['cpu']) for top in record['top']])
+    metric('process_memory_percent', 'gauge', f"Memory of the {EXPORT_TOP_N} busiest processes.",
+           [((('pid', top['pid']), ('name', top['name'])), top['mem']) for top in record['top']])
+    metric('process_collect_milliseconds', 'gauge', "Time taken by the last process table read.",
+           [((), round(collect_ms, 3))])
+    metric('sample_timestamp_seconds', 'gauge', "When the exported system sample was taken.", [((), record['timestamp'])])
+    metric('process_timestamp_seconds', 'gauge', "When the exported process table was read.",
+           [((), record['process_timestamp'])])
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Serves the latest published sample as Prometheus text (/metrics) and JSON (/metrics.json) from a cache"""
+
+    REQUEST_TIMEOUT = 5.0
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.host = host
+        self.port = port
+        self.scrapes = 0
+        self._lock = threading.Lock()
+        self._record = None
+        self._collect_ms = 0.0
+        self._bodies = {}
+        self._loop = None
+        self._thread = None
+        self._error = None
+
+    def publish(self, system, snapshot):
+        """Cache a new sample; called from the sampling side, never per scrape"""
+        record = headless_record(system, snapshot, EXPORT_TOP_N)
+        # The process table can be older than the system sample; say when it was read
+        record['process_timestamp'] = round(snapshot.timestamp, 3)
+        with self._lock:
+            self._record = record
+            self._collect_ms = snapshot.collect_ms
+            self._bodies = {}
+
+    def body(self, kind):
+        """Rendered body for 'prometheus' or 'json', or None before the first sample"""
+        with self._lock:
+            if self._record is None:
+                return None
+            if kind not in self._bodies:
+                if kind == 'prometheus':
+                    text = prometheus_text(self._record, self._collect_ms)
+                else:
+                    text = json.dumps(self._record)
+                self._bodies[kind] = text.encode()
+            return self._bodies[kind]
+
+    def respond(self, method, path):
+        """(status, content type, body) for one request"""
+        if method not in ('GET', 'HEAD'):
+            return '405 Method Not Allowed', 'text/plain', b"Only GET is supported\n"
+        routes = {
+            '/metrics': ('prometheus', 'text/plain; version=0.0.4; charset=utf-8'),
+            '/metrics.json': ('json', 'application/json')
+        }
+        if path == '/':
+            return '200 OK', 'text/plain', b"Ubuntu Task Manager Pro: /metrics (Prometheus), /metrics.json\n"
+        if path not in routes:
+            return '404 Not Found', 'text/plain', b"Not found\n"
+        kind, content_type = routes[path]
+        body = self.body(kind)
+        if body is None:
+            return '503 Service Unavailable', 'text/plain', b"No sample yet\n"
+        self.scrapes += 1
+        return '200 OK', content_type, body
+
+    async def handle(self, reader, writer):
+        import asyncio
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.REQUEST_TIMEOUT)
+            parts = request.split(b'\r\n', 1)[0].decode('latin-1').split()
+            if len(parts) != 3:
+                status, content_type, body = '400 Bad Request', 'text/plain', b"Bad request\n"
+                method = 'GET'
+            else:
+                method, target = parts[0], parts[1]
+                status, content_type, body = self.respond(method, target.split('?', 1)[0])
+            writer.write((
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+            ).encode())
+            if method != 'HEAD':
+                writer.write(body)
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def start(self):
+        """Bind and start serving; raises OSError if the port cannot be bound"""
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._serve, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def _serve(self, ready):
+        import asyncio
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            server = loop.run_until_complete(asyncio.start_server(self.handle, self.host, self.port))
+        except OSError as e:
+            self._error = e
+            loop.close()
+            ready.set()
+            return
+        # Port 0 picks a free port; report the real one
+        self.port = server.sockets[0].getsockname()[1]
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+
+    def stop(self, timeout=2.0):
+        if self._thread is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+
+
+def start_exporter(args):
+    """Start the metrics endpoint if --export-port was given; None if disabled or it cannot bind"""
+    if args.export_port is None:
+        return None
+    exporter = MetricsExporter(args.export_host, args.export_port)
+    try:
+        exporter.start()
+    except OSError as e:
+        print(f"Metrics endpoint disabled: {e}", file=sys.stderr)
+        return None
+    print(f"Serving metrics on http://{args.export_host}:{exporter.port}/metrics", file=sys.stderr)
+    return exporter
+
+
+def start_alerts(args):
+    """Alert engine and notifier from --alert-rules/--alert-command/--alert-log; exits on a bad rules file"""
+    try:
+        rules = load_alert_rules(args.alert_rules)
+        notifier = AlertNotifier(args.alert_log, args.alert_command)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Cannot load alert rules: {e}")
+    return AlertEngine(rules), notifier
+
+
+def run_headless(args):
+    """Sampling loop without any GUI; writes JSON lines or CSV"""
+    alert_engine, alert_notifier = start_alerts(args)
+    collector = ProcessCollector(interval=args.interval)
+    system = SystemCollector(interval=args.interval, disk_interval=args.interval)
+    # Prime the CPU and counter baselines so the first record has real rates
+    system.sample()
+    collector.sample()
+    if args.report_startup:
+        report_startup('headless', 'sampler ready')
+    if args.startup_only:
+        return
+
+    exporter = start_exporter(args)
+    out = sys.stdout if args.output == '-' else open(args.output, 'a', newline='')
+    writer = None
+    if args.format == 'csv':
+        writer = csv.DictWriter(out, fieldnames=HEADLESS_CSV_FIELDS)
+        if out is sys.stdout or out.tell() == 0:
+            writer.writeheader()
+
+    written = 0
+    next_tick = time.monotonic()
+    try:
+        while args.count is None or written < args.count:
+            next_tick += args.interval
+            now = time.monotonic()
+            if next_tick < now:
+                # A slow sample overran; skip the missed ticks instead of bursting
+                next_tick += (now - next_tick) // args.interval * args.interval + args.interval
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+
+            system_sample, snapshot = system.sample(), collector.sample()
+            if exporter is not None:
+                exporter.publish(system_sample, snapshot)
+            events = alert_engine.update(system_alert_metrics(system_sample)) + alert_engine.update_processes(snapshot)
+            if events:
+                alert_notifier.notify(events)
+            record = headless_record(system_sample, snapshot)
+            if writer is not None:
+                writer.writerow(csv_row(record))
+            else:
+                out.write(json.dumps(record) + "\n")
+            out.flush()
+            written += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if exporter is not None:
+            exporter.stop()
+        alert_notifier.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+def serve_speedtest(args):
+    """Run only the stand-in speed test server until interrupted"""
+    rate = args.serve_speedtest_rate * 1_000_000 / 8 if args.serve_speedtest_rate else None
+    server = SpeedTestServer(port=args.serve_speedtest, rate=rate)
+    server.start()
+    print(f"Speed test stand-in serving on {server.url} (use --speedtest-target {server.url})", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+def report_startup(mode, milestone):
+    """Print time from process start (interpreter included) and from the first import"""
+    since_exec = time.time() - psutil.Process().create_time()
+    since_import = time.perf_counter() - IMPORT_STARTED
+    print(f"startup ({mode}): {milestone} after {since_exec * 1000:.0f} ms from exec, "
+          f"{since_import * 1000:.0f} ms from import", file=sys.stderr)
+
+
+def positive_float(value):
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+
+def positive_int(value):
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ubuntu Task Manager Pro")
+    parser.add_argument('--headless', action='store_true', help="run only the sampling loop, no GUI")
+    parser.add_argument('--interval', type=positive_float, default=1.0, help="seconds between headless samples")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl', help="headless output format")
+    parser.add_argument('--output', default='-', help="headless output file, '-' for stdout")
+    parser.add_argument('--count', type=positive_int, default=None, help="stop after this many headless samples")
+    parser.add_argument('--history', type=positive_int, default=int(os.environ.get('TASK_MANAGER_HISTORY', 50)),
+                        help="samples kept in the live charts")
+    parser.add_argument('--metrics-dir', default=os.environ.get('TASK_MANAGER_METRICS_DIR', DEFAULT_METRICS_DIR),
+                        help="directory for the on-disk metrics history ('' to disable)")
+    parser.add_argument('--export-port', type=int, default=None,
+                        help="serve the latest sample as Prometheus text and JSON on this port (0 picks one)")
+    parser.add_argument('--export-host', default='127.0.0.1', help="address for the metrics endpoint")
+    parser.add_argument('--alert-rules', help="JSON file of alert rules (default: CPU, zombie and RSS rules)")
+    parser.add_argument('--alert-command', help="command run for each alert, with the alert in ALERT_* variables")
+    parser.add_argument('--alert-log', help="append alerts to this file instead of stderr")
+    parser.add_argument('--speedtest-target', default='speedtest.net',
+                        help="speed test target: speedtest.net, 'local' for a built-in stand-in server, or an http(s) URL")
+    parser.add_argument('--serve-speedtest', type=int, metavar='PORT',
+                        help="only run the stand-in speed test server on this port")
+    parser.add_argument('--serve-speedtest-rate', type=float, metavar='MBPS',
+                        help="throttle the stand-in server to this many Mbit/s")
+    parser.add_argument('--report-startup', action='store_true', help="print cold-start time to stderr")
+    parser.add_argument('--startup-only', action='store_true', help="exit once started (for measuring startup)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.startup_only:
+        args.report_startup = True
+
+    if args.serve_speedtest is not None:
+        serve_speedtest(args)
+        return
+
+    if args.headless:
+        run_headless(args)
+        return
+
+    alert_engine, alert_notifier = start_alerts(args)
+    import_gui()
     root = tk.Tk()
-    app = ModernUbuntuTaskManager(root)
+    app = ModernUbuntuTaskManager(
+        root, history_length=args.history, metrics_dir=args.metrics_dir, exporter=start_exporter(args),
+        alert_engine=alert_engine, alert_notifier=alert_notifier, speedtest_target=args.speedtest_target
+    )
+    if args.report_startup:
+        # Runs once the main loop is up and the first frame has been drawn
+        def first_frame():
+            report_startup('gui', 'first frame')
+            if args.startup_only:
+                root.destroy()
+        root.after_idle(first_frame)
     root.mainloop()
 
 if __name__ == "__main__":